@@ -0,0 +1,30 @@
+"""Adaptive refinement against uniform meshes: estimated error, DOFs and time.
+
+Run from the repo root:  python -m benchmarks.bench_adaptive [target]
+
+For each benchmark model, solve_adaptive runs to the target relative error (default 0.02);
+uniform meshes of decreasing max_area are solved for comparison and scored with the same
+ZZ estimator.
+"""
+import sys
+import time
+import numpy as np
+from geofea.core import run
+from geofea.core.adapt import solve_adaptive, zz_error, relative_error
+from geofea.core.materials.elastic import LinearElastic
+from benchmarks.models import MODELS
+
+def main(target=0.02, areas=(20.0, 5.0, 1.25)):
+    print(f"{'model':<10}{'mesh':<18}{'DOFs':>9}{'error':>9}{'seconds':>9}")
+    for name,build in MODELS.items():
+        geom,loads=build()
+        t0=time.perf_counter(); r=solve_adaptive(geom, loads, target=target, max_dofs=500_000); t=time.perf_counter()-t0
+        print(f"{name:<10}{'adaptive, '+str(len(r['history']))+' steps':<18}{r['history'][-1]['dofs']:>9d}{r['eta']:>9.4f}{t:>9.2f}  ({r['stop']})")
+        C=np.stack([np.linalg.inv(LinearElastic(m.E, m.nu).D()) for m in geom.materials.values()])
+        for a in areas:
+            t0=time.perf_counter(); u=run.solve_model(geom, loads, max_area=a); t=time.perf_counter()-t0; m=u['mesh']
+            e2,u2=zz_error(m['elems'], u['stress'].stress, m['topo'].areas, C, geom.material_ids(m['region_ids']))
+            print(f"{name:<10}{f'uniform {a:g}':<18}{2*len(m['nodes']):>9d}{relative_error(e2, u2):>9.4f}{t:>9.2f}")
+
+if __name__=='__main__':
+    main(*(float(a) for a in sys.argv[1:2]))
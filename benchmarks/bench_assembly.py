@@ -0,0 +1,42 @@
+"""Dense loop vs. vectorized sparse stiffness assembly.
+
+Run from the repo root:  python -m benchmarks.bench_assembly
+"""
+import time
+import numpy as np
+from geofea.core.fem import tri_B_matrix, assemble_K_linear
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.mesher_triangle import mesh_polygon
+
+def assemble_K_dense(nodes, elems, D, t_in):
+    # the original double-loop routine, kept here as the reference
+    n=nodes.shape[0]; K=np.zeros((2*n,2*n))
+    for tri in elems:
+        xy=nodes[tri]; B,A=tri_B_matrix(xy); ke=t_in*A*(B.T@D@B)
+        dof=[2*tri[0],2*tri[0]+1,2*tri[1],2*tri[1]+1,2*tri[2],2*tri[2]+1]
+        for i in range(6):
+            for j in range(6):
+                K[dof[i],dof[j]]+=ke[i,j]
+    return K
+
+def _best(fn, repeat):
+    t=[]
+    for _ in range(repeat):
+        t0=time.perf_counter(); out=fn(); t.append(time.perf_counter()-t0)
+    return min(t), out
+
+def main(areas=(400.0, 100.0, 25.0, 6.0), dense_max_dof=8000, repeat=3):
+    D=LinearElastic(30.0,0.2,False).D(); box=[(0,0),(480,0),(480,300),(0,300)]
+    print(f"{'max_area':>9} {'nodes':>8} {'elems':>8} {'dense s':>9} {'sparse s':>9} {'speedup':>8} {'max|dK|':>9}")
+    for a in areas:
+        nodes,elems=mesh_polygon(box, max_area=a)
+        ts,Ks=_best(lambda: assemble_K_linear(nodes, elems, D, 1.0), repeat)
+        if 2*len(nodes)<=dense_max_dof:
+            td,Kd=_best(lambda: assemble_K_dense(nodes, elems, D, 1.0), 1)
+            err=np.abs(Ks.toarray()-Kd).max(); sd=f'{td:9.4f}'; su=f'{td/ts:8.1f}'; se=f'{err:9.2e}'
+        else:
+            sd=su=se=f"{'-':>9}"
+        print(f'{a:9.1f} {len(nodes):8d} {len(elems):8d} {sd} {ts:9.4f} {su} {se}')
+
+if __name__=='__main__':
+    main()
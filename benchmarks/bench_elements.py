@@ -0,0 +1,26 @@
+"""3-node against 6-node triangles: accuracy per DOF and per second on the suite's cantilever.
+
+Run from the repo root:  python -m benchmarks.bench_elements
+
+Error is the mean tip deflection against the plane-strain Timoshenko solution, for a
+compressible (ν=0.3) and a nearly incompressible (ν=0.49) material, where CST locks.
+"""
+import time
+from benchmarks.suite import check_cantilever
+
+MESHES = {1: (2.0, 0.5, 0.125), 2: (32.0, 8.0, 2.0)}
+
+def main():
+    print(f"{'nu':>5}{'element':>9}{'max_area':>10}{'DOFs':>9}{'error':>9}{'seconds':>9}")
+    for nu in (0.3, 0.49):
+        for order,areas in MESHES.items():
+            for a in areas:
+                t0=time.perf_counter(); got,exact,_=check_cantilever(nu=nu, order=order, max_area=a); t=time.perf_counter()-t0
+                print(f"{nu:>5}{'T3' if order==1 else 'T6':>9}{a:>10g}{_dofs(order, a):>9d}{abs(got-exact)/exact:>9.4f}{t:>9.3f}")
+
+def _dofs(order, max_area):
+    from geofea.core.mesher_triangle import mesh_polygon
+    return 2*len(mesh_polygon([(0,0),(120,0),(120,12),(0,12)], max_area=max_area, order=order)[0])
+
+if __name__=='__main__':
+    main()
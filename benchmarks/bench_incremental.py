@@ -0,0 +1,48 @@
+"""Incremental remeshing/reassembly against a full rebuild after small edits of a layered model.
+
+Run from the repo root:  python -m benchmarks.bench_incremental [max_area]
+
+The model is the benchmark 'layered' section with a footing on top. Each edit (footing moved,
+bottom layer refined, footing material changed) is meshed and assembled twice: from scratch with
+mesh_geometry + assemble_K_linear, and through an IncrementalMesher that has seen the previous
+state. Reports the regions/blocks reused and checks the incremental K against a full assembly
+of the same mesh.
+"""
+import sys
+import time
+import numpy as np
+from geofea.core.fem import assemble_K_linear
+from geofea.core.incremental import IncrementalMesher
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.mesher_triangle import mesh_geometry
+from benchmarks.models import layered
+
+def _model():
+    g,_=layered(); g.materials['Concrete']=LinearElastic(3600.0, 0.2)
+    g.add_polygon('Footing', [(180,240),(260,240),(260,270),(180,270)], material='Concrete')
+    return g
+
+def _D(g): return np.stack([LinearElastic(m.E, m.nu).D() for m in g.materials.values()])
+
+def move_footing(g, a): g.region('Footing').outer=[(x+40,y) for x,y in g.region('Footing').outer]
+def refine_bottom(g, a): g.region('Layer1').max_area=a/2
+def soften_footing(g, a): g.materials['Concrete']=LinearElastic(2900.0, 0.2)
+
+EDITS = {'move footing': move_footing, 'refine bottom layer': refine_bottom, 'change footing material': soften_footing}
+
+def main(max_area=4.0):
+    g=_model(); C=IncrementalMesher(); m=C.mesh(g, max_area); C.stiffness(m, _D(g), 1.0, g.material_ids(m['region_ids']))
+    print(f"{'edit':<24}{'elems':>8}{'full mesh':>10}{'full K':>8}{'inc mesh':>9}{'inc K':>8}{'regions':>9}{'blocks':>8}{'K err':>9}")
+    for name,edit in EDITS.items():
+        edit(g, max_area); D=_D(g)
+        t0=time.perf_counter(); nodes,elems,rid=mesh_geometry(g, max_area); t1=time.perf_counter()
+        assemble_K_linear(nodes, elems, D, 1.0, mat_ids=g.material_ids(rid)); t2=time.perf_counter()
+        m=C.mesh(g, max_area); t3=time.perf_counter(); ids=g.material_ids(m['region_ids'])
+        K,_,reused=C.stiffness(m, D, 1.0, ids); t4=time.perf_counter()
+        Kf=assemble_K_linear(m['nodes'], m['elems'], D, 1.0, mat_ids=ids); err=abs(K-Kf).max()/abs(Kf).max()
+        kept=sum(p['reused'] for p in m['parts']); n=len(m['parts'])
+        print(f'{name:<24}{len(m["elems"]):>8d}{t1-t0:>10.3f}{t2-t1:>8.3f}{t3-t2:>9.3f}{t4-t3:>8.3f}'
+              f'{f"{kept}/{n}":>9}{f"{reused}/{n}":>8}{err:>9.1e}')
+
+if __name__=='__main__':
+    main(*(float(a) for a in sys.argv[1:2]))
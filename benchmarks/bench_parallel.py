@@ -0,0 +1,44 @@
+"""Strong scaling of the element-block kernels: fixed mesh, increasing worker count.
+
+Run from the repo root:  python -m benchmarks.bench_parallel [max_area]
+
+Times B-matrix construction, stiffness assembly (incl. the serial COO->CSR merge) and stress
+recovery, reports speedup/efficiency against one worker and checks every result is bit-for-bit
+identical to the one-worker run.
+"""
+import os
+import sys
+import time
+import numpy as np
+from geofea.core.fem import tri_B_batch, assemble_K_linear
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.mesher_triangle import mesh_polygon
+from geofea.core.post import recover_stresses
+from geofea.core.topology import MeshTopology
+
+def _best(fn, repeat):
+    t=[]
+    for _ in range(repeat):
+        t0=time.perf_counter(); out=fn(); t.append(time.perf_counter()-t0)
+    return min(t), out
+
+def main(max_area=4.0, workers=None, repeat=3):
+    mat=LinearElastic(30.0,0.2,False); D=mat.D()
+    nodes,elems=mesh_polygon([(0,0),(4800,0),(4800,1200),(0,1200)], max_area=max_area)
+    topo=MeshTopology(nodes, elems); u=np.random.default_rng(0).standard_normal(2*len(nodes))*1e-3
+    cpus=os.cpu_count() or 1
+    workers=workers or sorted({1,2,4,8,16,32,cpus} & set(range(1,cpus+1)))
+    print(f'{len(nodes)} nodes, {len(elems)} elements, {cpus} CPUs')
+    print(f"{'workers':>7} {'B s':>8} {'K s':>8} {'stress s':>9} {'total s':>8} {'speedup':>8} {'eff':>6} {'identical':>9}")
+    ref=None; t1=None
+    for w in workers:
+        tb,BA=_best(lambda: tri_B_batch(nodes, elems, w), repeat)
+        tk,K=_best(lambda: assemble_K_linear(nodes, elems, D, 1.0, BA=BA, workers=w), repeat)
+        ts,S=_best(lambda: recover_stresses(nodes, elems, u, mat, BA=BA, topo=topo, workers=w), repeat)
+        out=[BA[0], K.data, K.indices, S.stress, S.von_mises, S.nodal_stress]
+        if ref is None: ref=out; t1=tb+tk+ts
+        same=all(np.array_equal(a,b) for a,b in zip(out, ref)); tot=tb+tk+ts
+        print(f'{w:7d} {tb:8.3f} {tk:8.3f} {ts:9.3f} {tot:8.3f} {t1/tot:8.2f} {t1/tot/w:6.2f} {str(same):>9}')
+
+if __name__=='__main__':
+    main(*(float(a) for a in sys.argv[1:2]))
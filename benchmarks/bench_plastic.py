@@ -0,0 +1,52 @@
+"""Mohr–Coulomb plasticity: return-mapping throughput, collapse loads and strength reduction.
+
+Run from the repo root:  python -m benchmarks.bench_plastic
+
+- return mapping: stress points per second through MohrCoulomb.return_map for random trial
+  stresses, with and without a tension cut-off;
+- strip footing: collapse pressure of the suite's Tresca footing against Prandtl's (2+π)c, for
+  3- and 6-node triangles, with Anderson mixing and as plain modified Newton (memory=0), which
+  runs out of iterations before the true collapse load and so reports a low one;
+- slope: shear-strength-reduction factor of safety of the Griffiths & Lane (1999) 2:1 slope
+  (c/γH = 0.05, φ = 20°, ψ = 0), about 1.4 by limit equilibrium (Bishop 1.38). All trials reuse
+  one factorization.
+"""
+import time
+import numpy as np
+from geofea.core.materials.mohr_coulomb import MohrCoulomb
+from geofea.core.mesher_triangle import mesh_polygon
+from geofea.core.plastic import body_forces, factor_of_safety
+from geofea.core.solver import SolveSession
+from geofea.core.topology import MeshTopology
+from benchmarks.suite import check_strip_footing
+
+def return_mapping(n=500_000):
+    s=np.random.default_rng(0).normal(0, 0.01, (n,4))
+    for name,m in (('no cut-off', MohrCoulomb(10.0, 0.3, 0.01, 30.0, 5.0)), ('tension 0.002', MohrCoulomb(10.0, 0.3, 0.01, 30.0, 5.0, 0.002))):
+        t0=time.perf_counter(); out,y=m.return_map(s); t=time.perf_counter()-t0
+        print(f'return mapping {name:<14}{n/t/1e6:>8.2f} M points/s  ({y.mean():.0%} yielded, max f={m.yield_function(out).max():.1e})')
+
+def footing():
+    print(f"{'element':<9}{'mixing':<10}{'q_u/c':>8}{'Prandtl':>9}{'iterations':>12}{'seconds':>9}")
+    for order,area in ((1, 20.0), (2, 80.0)):
+        for memory in (5, 0):
+            t0=time.perf_counter(); qu,exact,_,r=check_strip_footing(order=order, max_area=area, memory=memory); t=time.perf_counter()-t0
+            print(f"{'T3' if order==1 else 'T6':<9}{'Anderson' if memory else 'none':<10}{qu/0.01:>8.3f}{exact/0.01:>9.3f}{r['info'].iterations:>12d}{t:>9.2f}")
+
+def slope(max_area=4000.0, order=2, H=400.0, gamma=120.0):
+    c=0.05*gamma/1728000*H
+    nodes,elems=mesh_polygon([(0,0),(4.4*H,0),(4.4*H,H),(3.2*H,H),(1.2*H,2*H),(0,2*H)], max_area=max_area, order=order)
+    fixed={}
+    for i in np.flatnonzero(np.isclose(nodes[:,1], 0)): fixed[2*i]=0.0; fixed[2*i+1]=0.0
+    for i in np.flatnonzero(np.isclose(nodes[:,0], 0)|np.isclose(nodes[:,0], 4.4*H)): fixed[2*i]=0.0
+    t0=time.perf_counter(); S=SolveSession(nodes, elems, 10.0, 0.3, 1.0, fixed, topo=MeshTopology(nodes, elems), reorder=True)
+    m=MohrCoulomb(10.0, 0.3, c, 20.0, 0.0, unit_weight_pcf=gamma); ids=np.zeros(len(elems), dtype=int)
+    r=factor_of_safety(S, body_forces(nodes, elems, S.BA, [m], ids, 1.0), [m], ids); t=time.perf_counter()-t0
+    print(f"slope FoS {r['fos']:.3f} (bracket {r['bracket'][0]:.3f}-{r['bracket'][1]:.3f}, Bishop 1.38): {len(r['trials'])} trials, "
+          f"{sum(x['iterations'] for x in r['trials'])} iterations, {2*len(nodes)} DOFs, one factorization, {t:.1f} s")
+
+def main():
+    return_mapping(); footing(); slope()
+
+if __name__=='__main__':
+    main()
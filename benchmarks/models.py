@@ -0,0 +1,31 @@
+"""Reproducible synthetic models for the benchmark suite.
+
+Each builder returns a GeometryModel and a load list in the GUI's format; sizes are set by the
+mesher's max_area, so the same builder gives a family of growing meshes.
+"""
+from geofea.core.geometry import GeometryModel, circle_points
+from geofea.core.materials.elastic import LinearElastic
+
+def rectangle(w=480.0, h=240.0):
+    g=GeometryModel(); g.add_polygon('Box', [(0,0),(w,0),(w,h),(0,h)])
+    loads=[{'type':'line','poly':[(0.25*w,h),(0.5*w,h)],'tx':0.0,'ty':-2.0},
+           {'type':'point','pt':(0.75*w,h),'Fx':0.5,'Fy':-1.0}]
+    return g, loads
+
+def circle(r=120.0, n=64):
+    """Disk discretised like the Circle sketch tool, loaded along its top arc."""
+    g=GeometryModel(); pts=circle_points((r, r), r, n); g.add_polygon('Disk', pts)
+    top=[p for p in pts if p[1]>=1.8*r]
+    loads=[{'type':'line','poly':sorted(top),'tx':0.0,'ty':-1.0}]
+    return g, loads
+
+def layered(w=480.0, thicknesses=(60.0, 90.0, 90.0), moduli=(60.0, 20.0, 5.0)):
+    """Horizontal layers, stiffest at the bottom, each with its own material; footing load on top."""
+    g=GeometryModel(); y=0.0
+    for i,(t,E) in enumerate(zip(thicknesses, moduli)):
+        g.materials[f'Layer{i+1}']=LinearElastic(E, 0.3)
+        g.add_polygon(f'Layer{i+1}', [(0,y),(w,y),(w,y+t),(0,y+t)], material=f'Layer{i+1}'); y+=t
+    loads=[{'type':'line','poly':[(0.4*w,y),(0.6*w,y)],'tx':0.0,'ty':-5.0}]
+    return g, loads
+
+MODELS = {'rectangle': rectangle, 'circle': circle, 'layered': layered}
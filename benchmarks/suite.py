@@ -0,0 +1,237 @@
+"""Benchmark and regression suite: meshing, topology, load mapping, assembly, solve, stresses and
+offscreen rendering on synthetic models of growing size, plus analytic accuracy checks.
+
+Run from the repo root:
+
+    python -m benchmarks.suite                     # quick sizes, compare with benchmarks/baseline.json
+    python -m benchmarks.suite --size full         # adds the large meshes
+    python -m benchmarks.suite --update-baseline   # record this machine's timings as the baseline
+
+Exits with status 1 when a stage is slower than baseline*(1+threshold) (and by more than
+--min-delta seconds, to ignore timer noise on tiny stages) or when an analytic check fails.
+Timings are only comparable on the machine that recorded the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import fields
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.path import Path
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from geofea.core.fem import assemble_K_linear
+from geofea.core.loads import edges_near_polyline, assemble_line_traction
+from geofea.core.materials.mohr_coulomb import MohrCoulomb
+from geofea.core.mesher_triangle import mesh_polygon, mesh_geometry, structured_mesh
+from geofea.core.plastic import solve_plastic
+from geofea.core import run
+from geofea.core.post import StressField, recover_stresses
+from geofea.core.project import in_memory, is_mapped, load_project, save_project
+from geofea.core.run import load_vector, default_fixity
+from geofea.core.solver import SolveSession, solve_linear
+from geofea.core.topology import MeshTopology
+from geofea.ui.render import MeshRenderer
+from benchmarks.models import MODELS
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SIZES = {'quick': (200.0, 50.0, 12.5), 'full': (200.0, 50.0, 12.5, 3.0, 0.75)}
+
+def _best(fn, repeat):
+    t=[]
+    for _ in range(repeat):
+        t0=time.perf_counter(); out=fn(); t.append(time.perf_counter()-t0)
+    return min(t), out
+
+def _mesh(geom, max_area):
+    if len(geom.regions)==1:
+        nodes,elems=mesh_polygon(geom.regions[0].outer, max_area=max_area)
+        return nodes, elems, np.zeros(len(elems), dtype=int)
+    return mesh_geometry(geom, max_area=max_area)
+
+def _render(nodes, elems, topo, values):
+    fig=Figure(figsize=(8,5), dpi=100); canvas=FigureCanvasAgg(fig); ax=fig.add_subplot(111)
+    R=MeshRenderer(ax); R.set_mesh(nodes, elems, topo); R.set_result(nodes, values)
+    ax.set_xlim(nodes[:,0].min(), nodes[:,0].max()); ax.set_ylim(nodes[:,1].min(), nodes[:,1].max())
+    canvas.draw()
+
+def bench_model(name, max_area, repeat=3):
+    """{stage: best seconds} and problem sizes for one model at one mesh size."""
+    geom,loads=MODELS[name]()
+    mats=list(geom.materials.values()); E=[m.E for m in mats]; nu=[m.nu for m in mats]
+    t={}
+    t['mesh'],(nodes,elems,rid)=_best(lambda: _mesh(geom, max_area), repeat)
+    ids=geom.material_ids(rid); D=np.stack([m.D() for m in mats])
+    def topology():
+        T=MeshTopology(nodes, elems); T.index; return T
+    t['topology'],topo=_best(topology, repeat)
+    mesh={'nodes':nodes, 'elems':elems, 'region_ids':rid, 'topo':topo}
+    t['loads'],F=_best(lambda: load_vector(mesh, loads), repeat)
+    t['assemble'],K=_best(lambda: assemble_K_linear(nodes, elems, D, 1.0, mat_ids=ids), repeat)
+    fixed=default_fixity(nodes)
+    t['solve'],u=_best(lambda: solve_linear(nodes, elems, E, nu, 1.0, F, fixed, mat_ids=ids), repeat)
+    t['stresses'],S=_best(lambda: recover_stresses(nodes, elems, u, mats, topo=topo, mat_ids=ids), repeat)
+    t['render'],_=_best(lambda: _render(nodes, elems, topo, S.von_mises), repeat)
+    return t, {'nodes':len(nodes), 'elements':len(elems), 'nnz':K.nnz}
+
+# -------- analytic checks --------
+def _edge_load(nodes, topo, a, b, ty_kip_ft=0.0, tx_kip_ft=0.0):
+    idx=edges_near_polyline(nodes, topo.boundary_edges, [a, b], tol_in=1e-6)
+    return assemble_line_traction(nodes, topo.boundary_edges, idx, tx_kip_ft, ty_kip_ft)
+
+def check_uniaxial_bar(E=30.0, nu=0.25, L=120.0, H=24.0, p=0.5, order=1):
+    """Plane-strain bar on rollers pulled by a uniform end traction p (ksi): CST and T6 reproduce
+    the linear field exactly, so the end displacement must be (1-ν²)·p·L/E to round-off."""
+    nodes,elems=mesh_polygon([(0,0),(L,0),(L,H),(0,H)], max_area=20.0, order=order); T=MeshTopology(nodes, elems)
+    F=_edge_load(nodes, T, (L,0), (L,H), tx_kip_ft=12*p)
+    u=solve_linear(nodes, elems, E, nu, 1.0, F, default_fixity(nodes))
+    end=np.isclose(nodes[:,0], L)
+    return float(u[0::2][end].mean()), (1-nu**2)*p*L/E, 1e-9
+
+def check_cantilever(E=30000.0, nu=0.3, L=120.0, H=12.0, P=1.0, order=1, max_area=0.5):
+    """Clamped cantilever with an end shear P (kip): mean tip deflection against the Timoshenko
+    beam solution in plane strain (E'=E/(1-ν²), ν'=ν/(1-ν)). CST is within ~1.2% at the default
+    mesh (4.7k DOFs); T6 is within ~0.4% at max_area=8 (1.2k DOFs)."""
+    nodes,elems=mesh_polygon([(0,0),(L,0),(L,H),(0,H)], max_area=max_area, order=order); T=MeshTopology(nodes, elems)
+    fixed={}
+    for i in np.flatnonzero(np.isclose(nodes[:,0], 0)): fixed[2*i]=0.0; fixed[2*i+1]=0.0
+    F=_edge_load(nodes, T, (L,0), (L,H), ty_kip_ft=-12*P/H)
+    u=solve_linear(nodes, elems, E, nu, 1.0, F, fixed)
+    Ep=E/(1-nu**2); nup=nu/(1-nu); I=H**3/12
+    exact=P*L**3/(3*Ep*I)+(4+5*nup)*P*L/(2*Ep*H)
+    return float(-u[1::2][np.isclose(nodes[:,0], L)].mean()), exact, 0.02
+
+def check_load_resultant():
+    """Line-load mapping must conserve the resultant: 2 kip/ft over 10 ft of the rectangle top."""
+    geom,loads=MODELS['rectangle']()
+    nodes,elems=mesh_polygon(geom.regions[0].outer, max_area=50.0)
+    mesh={'nodes':nodes, 'elems':elems, 'topo':MeshTopology(nodes, elems)}
+    return float(load_vector(mesh, loads[:1])[1::2].sum()), -2.0*120.0/12.0, 1e-12
+
+def check_fallback_mesh(V=((0,0),(30,10),(20,40),(-10,30)), max_area=5.0):
+    """The grid fallback mesher (used without `triangle`) on a skewed polygon: no element may exceed
+    max_area and the elements must cover the polygon exactly."""
+    V=np.asarray(V, float); n=len(V); P=Path(V)
+    nodes,elems,_=structured_mesh(V, np.column_stack([np.arange(n), np.roll(np.arange(n), -1)]),
+                                  lambda c: np.where(P.contains_points(c), 0, -1), max_area)
+    xy=nodes[elems]; d1=xy[:,1]-xy[:,0]; d2=xy[:,2]-xy[:,0]; a=0.5*(d1[:,0]*d2[:,1]-d2[:,0]*d1[:,1])
+    if a.max()>max_area or a.min()<=0: raise AssertionError(f'element areas {a.min():g}…{a.max():g} outside (0, {max_area:g}]')
+    x,y=V.T; return float(a.sum()), 0.5*float(abs(x@np.roll(y,-1)-y@np.roll(x,-1))), 1e-9
+
+def check_strip_footing(c=0.01, B=24.0, order=2, max_area=80.0, memory=5):
+    """Flexible strip load of width B on weightless Tresca soil (φ=0, cohesion c ksi), modelled as
+    a half section: the collapse pressure must approach Prandtl's (2+π)c. The load 0.07 ksi is
+    applied in 20 increments; returns (q_u, exact, tol, solve_plastic result). T6 is within ~1%;
+    CST locks under isochoric plastic flow and overestimates q_u by ~30%."""
+    W=H=5*B; q=0.07
+    nodes,elems=mesh_polygon([(0,0),(W,0),(W,H),(0,H)], max_area=max_area, order=order); T=MeshTopology(nodes, elems)
+    F=_edge_load(nodes, T, (0,H), (B/2,H), ty_kip_ft=-12*q)
+    S=SolveSession(nodes, elems, 10.0, 0.3, 1.0, default_fixity(nodes), topo=T, reorder=True)
+    r=solve_plastic(S, F, [MohrCoulomb(10.0, 0.3, c, 0.0)], steps=20, max_iter=300, memory=memory)
+    return r['load_factor']*q, (2+np.pi)*c, 0.03, r
+
+def check_project_roundtrip(plastic=False):
+    """Save a solved rectangle model to a .gfp and reopen it: mesh, displacements and every stress
+    field (with 'yielded' for a Mohr–Coulomb solve) must come back bit for bit."""
+    geom,loads=MODELS['rectangle']()
+    if plastic: geom.materials={k: MohrCoulomb(m.E, m.nu, 0.05, 30.0) for k,m in geom.materials.items()}
+    res=run.solve_model(geom, loads, max_area=200.0, steps=2); mesh=res['mesh']; S=res['stress']
+    with tempfile.TemporaryDirectory() as d:
+        path=os.path.join(d, 'check.gfp')
+        save_project(path, geom, loads, {}, mesh, geom.material_ids(mesh['region_ids']), res['u'], S, res['info'].reactions)
+        P=load_project(path, mmap=False); m=P.mesh(); L=P.stress(m['topo'])
+        names=[f.name for f in fields(StressField) if f.name!='topo' and getattr(S, f.name) is not None]
+        if plastic and 'yielded' not in names: raise AssertionError('plastic solve has no yielded field')
+        diff=max([float(np.abs(P.u-res['u']).max()), float(np.abs(m['nodes']-mesh['nodes']).max())]+
+                 [float(np.abs(getattr(L, k)-getattr(S, k)).max()) for k in names])
+    return 1.0+diff, 1.0, 0.0
+
+def check_project_save_in_place():
+    """Open a project memory-mapped, save it back to the same path the way the GUI does (mapped
+    arrays copied into memory first, as Windows cannot replace a mapped file) and reopen it."""
+    geom,loads=MODELS['rectangle']()
+    res=run.solve_model(geom, loads, max_area=200.0); mesh=res['mesh']
+    with tempfile.TemporaryDirectory() as d:
+        path=os.path.join(d, 'check.gfp')
+        save_project(path, geom, loads, {}, mesh, geom.material_ids(mesh['region_ids']), res['u'], res['stress'], res['info'].reactions)
+        P=load_project(path); memo={}; m=in_memory(P.mesh(), memo); u=in_memory(P.u, memo)
+        S=in_memory(P.stress(m['topo']), memo); R=in_memory(P.reactions, memo); del P
+        held=[*m.values(), *m['topo'].arrays().values(), u, R]+[getattr(S, f.name) for f in fields(StressField) if f.name!='topo']
+        if any(is_mapped(a) for a in held): raise AssertionError('arrays still mapped from the project file')
+        save_project(path, geom, loads, {}, m, geom.material_ids(m['region_ids']), u, S, R)
+        Q=load_project(path, mmap=False); diff=max(float(np.abs(Q.u-res['u']).max()), float(np.abs(Q.mesh()['nodes']-mesh['nodes']).max()),
+                                                   float(np.abs(Q.stress().von_mises-res['stress'].von_mises).max()))
+    return 1.0+diff, 1.0, 0.0
+
+def _check_cantilever_t6():
+    got,exact,_=check_cantilever(order=2, max_area=8.0); return got, exact, 0.01
+
+CHECKS = {'uniaxial bar': check_uniaxial_bar, 'uniaxial bar T6': lambda: check_uniaxial_bar(order=2),
+          'cantilever': check_cantilever, 'cantilever T6': _check_cantilever_t6, 'load resultant': check_load_resultant,
+          'fallback mesh': check_fallback_mesh, 'fallback mesh sliver': lambda: check_fallback_mesh(((0,0),(100,0),(100,3),(0,1.5)), 50.0),
+          'strip footing T6': lambda: check_strip_footing()[:3], 'project round-trip': check_project_roundtrip,
+          'project round-trip MC': lambda: check_project_roundtrip(plastic=True), 'project save in place': check_project_save_in_place}
+
+def run_checks():
+    out={}
+    for name,fn in CHECKS.items():
+        got,exact,tol=fn(); err=abs(got-exact)/abs(exact)
+        out[name]={'value': got, 'exact': exact, 'rel_error': err, 'tol': tol, 'ok': bool(err<=tol)}
+    return out
+
+# -------- baseline --------
+def compare(results, baseline, threshold, min_delta):
+    """Keys whose time regressed past the threshold: {key: (baseline_s, now_s)}."""
+    return {k: (baseline[k], t) for k,t in results.items()
+            if k in baseline and t>baseline[k]*(1+threshold) and t-baseline[k]>min_delta}
+
+def main(argv=None):
+    ap=argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.split('\n')[0])
+    ap.add_argument('--size', choices=sorted(SIZES), default='quick')
+    ap.add_argument('--models', nargs='+', choices=sorted(MODELS), default=sorted(MODELS))
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--baseline', default=BASELINE)
+    ap.add_argument('--update-baseline', action='store_true', help='write this run as the new baseline')
+    ap.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown (default 0.25)')
+    ap.add_argument('--min-delta', type=float, default=0.005, help='ignore slowdowns below this many seconds')
+    ap.add_argument('--json', help='also write the full results here')
+    a=ap.parse_args(argv)
+
+    results={}; sizes={}
+    print(f"{'model':<10}{'max_area':>9}{'elems':>9}" + ''.join(f'{s:>10}' for s in ('mesh','topology','loads','assemble','solve','stresses','render')))
+    for name in a.models:
+        for area in SIZES[a.size]:
+            t,n=bench_model(name, area, a.repeat); key=f'{name}/{area:g}'; sizes[key]=n
+            results.update({f'{key}/{s}': v for s,v in t.items()})
+            print(f'{name:<10}{area:>9g}{n["elements"]:>9d}' + ''.join(f'{v:>10.4f}' for v in t.values()))
+
+    checks=run_checks(); failed=[k for k,c in checks.items() if not c['ok']]
+    for k,c in checks.items():
+        print(f"check {k:<16} value={c['value']:.6g} exact={c['exact']:.6g} rel.err={c['rel_error']:.2e} (tol {c['tol']:.0e}) {'ok' if c['ok'] else 'FAILED'}")
+
+    report={'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+            'size': a.size, 'repeat': a.repeat, 'results': results, 'sizes': sizes, 'checks': checks}
+    if a.json:
+        with open(a.json, 'w') as f: json.dump(report, f, indent=2)
+    regressed={}
+    if a.update_baseline:
+        base={}
+        if os.path.exists(a.baseline):
+            with open(a.baseline) as f: base=json.load(f).get('results', {})
+        report['results']=dict(base, **results)
+        with open(a.baseline, 'w') as f: json.dump(report, f, indent=2, sort_keys=True)
+        print(f'baseline written to {a.baseline}')
+    elif os.path.exists(a.baseline):
+        with open(a.baseline) as f: base=json.load(f)
+        regressed=compare(results, base['results'], a.threshold, a.min_delta)
+        for k,(b,t) in sorted(regressed.items()): print(f'REGRESSION {k}: {b:.4f} s -> {t:.4f} s ({t/b-1:+.0%})')
+        if not regressed: print(f"no regressions against {a.baseline} ({base['machine']['platform']})")
+    else:
+        print(f'no baseline at {a.baseline}; run with --update-baseline to record one')
+    return 1 if regressed or failed else 0
+
+if __name__=='__main__':
+    sys.exit(main())
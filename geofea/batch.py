@@ -0,0 +1,167 @@
+
+"""Headless batch runs for parametric studies.
+
+    python -m geofea.batch STUDY.json [MODEL.gfp ...] -o results/ -j 8
+
+A .gfp argument is one case: the project's geometry, materials and loads as saved from the GUI.
+A study file names a base model and the variations to run:
+
+    {"model": "slope.gfp",              # path relative to the study file
+     "max_area": 25.0, "t_in": 1.0,     # defaults for every case (also "order": 2 for 6-node triangles)
+     "cases": [{"name": "soft", "E": {"Clay": 5.0}}, {"load_scale": 2.0}],
+     "sweep": {"E.Clay": [5, 10, 20], "nu.Clay": [0.25, 0.35], "load_scale": [1, 2]}}
+
+Case keys: name, model, max_area, order, t_in, load_scale, E/nu ({material: value}), loads (a full
+replacement load list). "sweep" adds the Cartesian product of its values (dotted keys address
+E/nu entries). Cases are grouped by mesh (model + max_area + order); each group is meshed once per
+work unit, or not at all when the project already holds a mesh for that max_area, and consecutive
+cases that share materials also reuse the factorization. Results go to <out>/<name>.gfp (see
+geofea.core.project) plus one row per case in <out>/summary.csv.
+"""
+from __future__ import annotations
+import argparse
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from geofea.core import run
+from geofea.core.parallel import set_workers
+from geofea.core.profiling import Profile
+from geofea.core.project import load_project, save_project
+
+CASE_KEYS = {'name', 'model', 'max_area', 'order', 't_in', 'load_scale', 'E', 'nu', 'loads'}
+SUMMARY = ['name', 'model', 'status', 'nodes', 'elems', 'ndof', 'nfree', 'method', 'solve_s', 'u_max', 'von_mises_max', 'Rx', 'Ry', 'load_factor', 'file']
+
+def _set(case, key, value):
+    head,_,tail=key.partition('.')
+    if tail: case.setdefault(head, {})[tail]=value
+    else: case[key]=value
+
+def expand_study(path):
+    """List of case dicts (with absolute model paths) for a study .json or a single .gfp."""
+    path=os.path.abspath(path)
+    if not path.endswith('.json'):
+        return [{'name': os.path.splitext(os.path.basename(path))[0], 'model': path}]
+    with open(path) as f: spec=json.load(f)
+    root=os.path.dirname(path); stem=os.path.splitext(os.path.basename(path))[0]
+    base={k: v for k,v in spec.items() if k in CASE_KEYS and k!='name'}
+    cases=[dict(copy.deepcopy(base), **c) for c in spec.get('cases', [])]
+    sweep=spec.get('sweep', {})
+    for values in itertools.product(*sweep.values()) if sweep else ():
+        case=copy.deepcopy(base)
+        for k,v in zip(sweep, values): _set(case, k, v)
+        cases.append(case)
+    if not cases: cases=[base]
+    for i,c in enumerate(cases):
+        unknown=set(c)-CASE_KEYS
+        if unknown: raise ValueError(f'{path}: unknown case keys {sorted(unknown)}')
+        if 'model' not in c: raise ValueError(f'{path}: case {i} has no model')
+        c['model']=os.path.join(root, c['model']); c.setdefault('name', f'{stem}-{i:04d}')
+    return cases
+
+def mesh_key(case, geom):
+    """Cases with equal keys can share one mesh."""
+    g=[(r.name, r.outer, r.holes, r.max_area) for r in geom.regions]
+    return hashlib.blake2b(json.dumps([case['model'], g, case.get('max_area'), case.get('order')], default=float).encode(), digest_size=16).hexdigest()
+
+def _case_model(case, models):
+    if case['model'] not in models: models[case['model']]=load_project(case['model'])
+    P=models[case['model']]; geom=copy.deepcopy(P.geom)
+    for name in set(case.get('E', {}))|set(case.get('nu', {})):
+        if name not in geom.materials: raise KeyError(f"{case['name']}: undefined material {name!r}")
+        m=geom.materials[name]=copy.copy(geom.materials[name])
+        m.E=case.get('E', {}).get(name, m.E); m.nu=case.get('nu', {}).get(name, m.nu)
+    return P, geom, case.get('loads', P.loads)
+
+def run_cases(cases, out_dir=None, profile=False):
+    """Run cases in this process, in order, reusing the mesh and factorization of the previous case
+    where they still apply; returns one summary row per case. With `profile`, each case also runs
+    under cProfile/tracemalloc and writes <out_dir>/<name>.profile.json."""
+    models={}; key=mesh=session=None; rows=[]
+    for case in cases:
+        row={'name': case['name'], 'model': case['model']}
+        try:
+            P, geom, loads = _case_model(case, models)
+            t_in=case.get('t_in', P.settings.get('t_in', 1.0)); max_area=case.get('max_area', P.settings.get('max_area'))
+            order=case.get('order', P.settings.get('order', 1))
+            if mesh_key(case, geom)!=key:
+                key=mesh_key(case, geom); session=None
+                same=max_area==P.settings.get('max_area') and order==P.settings.get('order', 1)
+                saved=P.mesh() if same else None
+                mesh=saved if saved is not None else run.mesh_model(geom, max_area, order=order)
+            t0=time.perf_counter(); P=Profile(case['name'], capture=profile)
+            res=run.solve_model(geom, loads, t_in, mesh, session, max_area, load_scale=case.get('load_scale', 1.0), profile=P)
+            session=res['session']; info=res['info']; u=res['u']; R=info.reactions
+            row.update(status='ok', nodes=len(mesh['nodes']), elems=len(mesh['elems']), ndof=info.ndof, nfree=info.nfree, method=info.method,
+                       solve_s=round(time.perf_counter()-t0, 4), u_max=float(np.abs(u).max()),
+                       von_mises_max=float(res['stress'].von_mises.max()), Rx=float(R[0::2].sum()), Ry=float(R[1::2].sum()))
+            if 'load_factor' in res: row['load_factor']=res['load_factor']   # Mohr–Coulomb models: collapse if < 1
+            if out_dir is not None:
+                row['file']=os.path.join(out_dir, case['name']+'.gfp')
+                settings={'t_in': t_in, 'max_area': max_area, 'order': order, 'load_scale': case.get('load_scale', 1.0)}
+                save_project(row['file'], geom, loads, settings, mesh, geom.material_ids(mesh['region_ids']), u, res['stress'], R)
+                if profile: P.to_json(os.path.join(out_dir, case['name']+'.profile.json'))
+        except Exception as e:
+            row['status']=f'{type(e).__name__}: {e}'
+        rows.append(row)
+    return rows
+
+def plan(cases, chunk=16):
+    """Group cases by mesh and split groups into chunks of at most `chunk` cases (the work units)."""
+    models={}; groups={}
+    for case in cases:
+        try: key=mesh_key(case, _case_model(case, models)[1])
+        except Exception: key=case['name']       # reported as a failed case by run_cases
+        groups.setdefault(key, []).append(case)
+    return [g[i:i+chunk] for g in groups.values() for i in range(0, len(g), chunk)]
+
+def run_batch(cases, out_dir=None, jobs=None, chunk=16, progress=None, threads=1, profile=False):
+    """Run cases across `jobs` processes (1 runs in-process), each using `threads` element-block
+    workers; returns summary rows in case order."""
+    work=plan(cases, chunk); order={c['name']: i for i,c in enumerate(cases)}; rows=[]
+    if out_dir is not None: os.makedirs(out_dir, exist_ok=True)
+    if jobs==1:
+        set_workers(threads)
+        for w in work:
+            rows+=run_cases(w, out_dir, profile)
+            if progress: progress(len(rows), len(cases))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=set_workers, initargs=(threads,)) as pool:
+            for fut in as_completed([pool.submit(run_cases, w, out_dir, profile) for w in work]):
+                rows+=fut.result()
+                if progress: progress(len(rows), len(cases))
+    return sorted(rows, key=lambda r: order[r['name']])
+
+def write_summary(path, rows):
+    with open(path, 'w', newline='') as f:
+        w=csv.DictWriter(f, SUMMARY, extrasaction='ignore'); w.writeheader(); w.writerows(rows)
+
+def main(argv=None):
+    ap=argparse.ArgumentParser(prog='python -m geofea.batch', description='Run GeoFEA models headless.')
+    ap.add_argument('inputs', nargs='+', help='study .json files and/or project .gfp files')
+    ap.add_argument('-o', '--out', default='results', help='output directory (default: results)')
+    ap.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    ap.add_argument('--chunk', type=int, default=16, help='cases per work unit sharing one mesh (default: 16)')
+    ap.add_argument('--threads', type=int, default=1, help='element-block threads per process (default: 1)')
+    ap.add_argument('--summary-only', action='store_true', help='write summary.csv but no per-case result files')
+    ap.add_argument('--profile', action='store_true', help='write a cProfile/tracemalloc report per case')
+    a=ap.parse_args(argv)
+    cases=[c for p in a.inputs for c in expand_study(p)]
+    names=[c['name'] for c in cases]
+    if len(set(names))!=len(names): ap.error('case names must be unique')
+    t0=time.perf_counter()
+    def progress(done, total): print(f'\r{done}/{total} cases', end='', flush=True)
+    rows=run_batch(cases, None if a.summary_only else a.out, a.jobs, a.chunk, progress, a.threads, a.profile); print()
+    os.makedirs(a.out, exist_ok=True); write_summary(os.path.join(a.out, 'summary.csv'), rows)
+    failed=[r for r in rows if r['status']!='ok']
+    print(f'{len(rows)-len(failed)} ok, {len(failed)} failed in {time.perf_counter()-t0:.1f} s; summary: {os.path.join(a.out, "summary.csv")}')
+    for r in failed: print(f"  {r['name']}: {r['status']}")
+    return 1 if failed else 0
+
+if __name__=='__main__':
+    raise SystemExit(main())
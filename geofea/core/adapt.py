@@ -0,0 +1,98 @@
+"""Adaptive h-refinement driven by a Zienkiewicz–Zhu error estimate.
+
+The recovered stress σ* is the area-weighted nodal average of the element stresses (taken per
+material, so physical jumps at material interfaces are not counted as error), interpolated
+linearly over each element. The element error is the energy norm of σ*-σh, integrated exactly
+with the edge-midpoint rule. Elements whose error exceeds an equal share of the target are
+given an area bound A/ξ² (linear elements: h ∝ 1/ξ) and the mesh is refined with triangle's
+'r' switch; other elements are only split where quality requires it.
+"""
+import numpy as np
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.mesher_triangle import refine_mesh
+from geofea.core.profiling import Profile, no_progress
+from geofea.core.run import mesh_model, solve_model, default_fixity
+from geofea.core.topology import MeshTopology
+
+def recovered_stress(elems, stress, areas, groups=None):
+    """Smoothed stress at the corners of every element, (m,3,k): the area-weighted average of
+    the element stresses around each node, taken separately for each group (material)."""
+    elems=np.asarray(elems)[:,:3]; m,k=stress.shape
+    g=np.zeros(m, dtype=int) if groups is None else np.asarray(groups, dtype=int); ng=int(g.max())+1
+    key=(elems*ng+g[:,None]).ravel(); n=int(key.max())+1; w=np.repeat(areas, 3)
+    den=np.bincount(key, weights=w, minlength=n); den[den==0]=1.0
+    S=np.repeat(stress, 3, axis=0)
+    avg=np.column_stack([np.bincount(key, weights=w*S[:,j], minlength=n) for j in range(k)])/den[:,None]
+    return avg[key].reshape(m,3,k)
+
+def zz_error(elems, stress, areas, C, mat_ids=None):
+    """Per-element squared energy norms (per unit thickness) of the error estimate,
+    ∫(σ*-σh)ᵀC(σ*-σh)dA, and of the finite-element stress, ∫σhᵀCσh dA. C is one compliance
+    (3,3) or a (k,3,3) stack indexed by mat_ids; stress columns are xx, yy, xy."""
+    C=np.asarray(C, dtype=float); Ce=C if C.ndim==2 else C[np.asarray(mat_ids)]
+    Sn=recovered_stress(elems, stress, areas, mat_ids)
+    e=0.5*(Sn+Sn[:,[1,2,0]])-stress[:,None,:]   # error at the three edge midpoints
+    if C.ndim==2:
+        err2=areas/3*np.einsum('mqi,ij,mqj->m', e, Ce, e); u2=areas*np.einsum('mi,ij,mj->m', stress, Ce, stress)
+    else:
+        err2=areas/3*np.einsum('mqi,mij,mqj->m', e, Ce, e); u2=areas*np.einsum('mi,mij,mj->m', stress, Ce, stress)
+    return err2, u2
+
+def relative_error(err2, u2):
+    """Global estimated relative error in the energy norm, ‖e‖/√(‖u‖²+‖e‖²)."""
+    return float(np.sqrt(err2.sum()/max(err2.sum()+u2.sum(), 1e-300)))
+
+def target_areas(areas, err2, u2, target, max_split=16.0, max_elems=None, min_area=0.0):
+    """Area bound per element for the next mesh (-1: none). Each element's error is driven to
+    an equal share of `target`, at most max_split-fold refinement per step and not below
+    min_area (point loads and re-entrant corners never converge). With max_elems the share is
+    relaxed until the predicted element count (≈ the DOF count) fits."""
+    m=len(areas); xi2=err2/(target**2*(err2.sum()+u2.sum())/m)
+    xi2=np.minimum(xi2, np.maximum(areas/max(min_area, 1e-300), 1.0))
+    def predicted(s): return np.clip(xi2/s, 1.0, max_split).sum()
+    s=1.0
+    if max_elems is not None and predicted(s)>max_elems:
+        lo,hi=1.0, max(float(xi2.max()), 1.0)
+        for _ in range(50):
+            mid=np.sqrt(lo*hi); lo,hi=(mid,hi) if predicted(mid)>max_elems else (lo,mid)
+        s=hi
+    r=np.minimum(xi2/s, max_split)
+    return np.where(r>1.0, areas/np.maximum(r, 1.0), -1.0)
+
+def solve_adaptive(geom, loads, t_in=1.0, target=0.05, max_dofs=200_000, max_steps=8, max_area=None,
+                   fixity=default_fixity, method='auto', report=None, profile=None):
+    """Mesh at max_area (default: about 500 elements over the model's bounding box), then solve,
+    estimate and refine until the estimated relative error is at most `target`, the next mesh
+    would exceed `max_dofs`, or after max_steps solves. Elements are not refined below 1e-8 of
+    the bounding-box area. fixity(nodes) gives each mesh's supports.
+
+    Returns the last run.solve_model result with 'profile' covering the whole loop, plus
+    'error' (element error norms), 'eta' (relative error), 'history' (one dict per step) and
+    'stop' ('target', 'budget', 'stalled' when refinement stops reducing the error, or 'steps')."""
+    report=report or no_progress; P=profile if profile is not None else Profile('adaptive')
+    mats=list(geom.materials.values()); C=np.stack([np.linalg.inv(LinearElastic(m.E, m.nu).D()) for m in mats])
+    xy=np.vstack([np.asarray(r.outer, float) for r in geom.regions]); box=float(np.prod(np.ptp(xy, axis=0)))
+    if max_area is None: max_area=box/500
+    mesh=mesh_model(geom, max_area, profile=P); history=[]; stop='steps'
+    for step in range(1, max_steps+1):
+        report(f'Step {step}: solving {2*len(mesh["nodes"])} DOFs', int(90*(step-1)/max_steps))
+        S=Profile(f'step {step}')
+        res=solve_model(geom, loads, t_in, mesh=mesh, fixed=fixity(mesh['nodes']), method=method, profile=S)
+        with S.stage('error estimate'):
+            ids=geom.material_ids(mesh['region_ids'])
+            err2,u2=zz_error(mesh['elems'], res['stress'].stress, mesh['topo'].areas, C, ids); eta=relative_error(err2, u2)
+        P.add_stage(f'step {step}', S.total_s)
+        history.append({'step': step, 'nodes': len(mesh['nodes']), 'elements': len(mesh['elems']),
+                        'dofs': 2*len(mesh['nodes']), 'eta': eta, 'seconds': S.total_s})
+        if eta<=target: stop='target'; break
+        if len(history)>1 and eta>0.98*history[-2]['eta']: stop='stalled'; break   # only singular points left
+        if step==max_steps: break
+        with P.stage(f'refine {step}'):
+            A=target_areas(mesh['topo'].areas, err2, u2, target, max_elems=max_dofs, min_area=1e-8*box)
+            if not (A>0).any(): stop='budget'; break
+            nodes,elems,rid=refine_mesh(mesh['nodes'], mesh['elems'], A, geom, mesh['region_ids'])
+        if 2*len(nodes)>max_dofs: stop='budget'; break
+        with P.stage(f'topology {step}'): mesh={'nodes':nodes, 'elems':elems, 'region_ids':rid, 'topo':MeshTopology(nodes, elems)}
+    last=history[-1]; P.count(nodes=last['nodes'], elements=last['elements'], dofs=last['dofs'], steps=len(history), eta=eta, stop=stop)
+    res.update(profile=P, error=np.sqrt(err2), eta=eta, history=history, stop=stop)
+    return res
@@ -1,5 +1,7 @@
 
 import numpy as np
+import scipy.sparse as sp
+from geofea.core.parallel import map_blocks
 
 def tri_B_matrix(xy):
     x1,y1=xy[0]; x2,y2=xy[1]; x3,y3=xy[2]
@@ -10,15 +12,91 @@ def tri_B_matrix(xy):
     B=(1/(2*A))*np.array([[b1,0,b2,0,b3,0],[0,c1,0,c2,0,c3],[c1,b1,c2,b2,c3,b3]])
     return B, abs(A)
 
-def assemble_K_linear(nodes, elems, D, t_in):
-    n=nodes.shape[0]; K=np.zeros((2*n,2*n))
-    for tri in elems:
-        xy=nodes[tri]; B,A=tri_B_matrix(xy); ke=t_in*A*(B.T@D@B)
-        dof=[2*tri[0],2*tri[0]+1,2*tri[1],2*tri[1]+1,2*tri[2],2*tri[2]+1]
-        for i in range(6):
-            for j in range(6):
-                K[dof[i],dof[j]]+=ke[i,j]
-    return K
+def tri_B_batch(nodes, elems, workers=None):
+    """tri_B_matrix for every element at once: B (m,3,6) and areas (m,), computed in element blocks."""
+    elems=np.asarray(elems); B=np.zeros((len(elems),3,6)); A=np.empty(len(elems))
+    def block(s):
+        xy=nodes[elems[s]]; x=xy[:,:,0]; y=xy[:,:,1]
+        A2=(x[:,1]-x[:,0])*(y[:,2]-y[:,0])-(x[:,2]-x[:,0])*(y[:,1]-y[:,0])
+        if np.any(np.isclose(0.5*A2,0)): raise ValueError('Degenerate triangle')
+        b=np.stack([y[:,1]-y[:,2], y[:,2]-y[:,0], y[:,0]-y[:,1]], axis=1)
+        c=np.stack([x[:,2]-x[:,1], x[:,0]-x[:,2], x[:,1]-x[:,0]], axis=1)
+        Bs=B[s]; Bs[:,0,0::2]=b; Bs[:,1,1::2]=c; Bs[:,2,0::2]=c; Bs[:,2,1::2]=b
+        Bs/=A2[:,None,None]; A[s]=0.5*np.abs(A2)
+    map_blocks(block, len(elems), workers)
+    return B, A
+
+# 3-point rule on the reference triangle, exact for quadratics: points (ξ,η), weights summing to 1/2
+T6_GAUSS = (np.array([[1/6,1/6],[2/3,1/6],[1/6,2/3]]), np.full(3, 1/6))
+
+def t6_shape(pts):
+    """Quadratic triangle shape functions N (k,6) and their (ξ,η) derivatives (k,2,6) at reference
+    points (k,2). Node order: corners 0-2, then the mid-sides of edges 0-1, 1-2 and 2-0."""
+    xi,eta=np.asarray(pts, float).T; L1=1-xi-eta; L2=xi; L3=eta; z=np.zeros_like(xi)
+    N=np.stack([L1*(2*L1-1), L2*(2*L2-1), L3*(2*L3-1), 4*L1*L2, 4*L2*L3, 4*L3*L1], axis=1)
+    dxi=np.stack([1-4*L1, 4*L2-1, z, 4*(L1-L2), 4*L3, -4*L3], axis=1)
+    deta=np.stack([1-4*L1, z, 4*L3-1, -4*L2, 4*L2, 4*(L1-L3)], axis=1)
+    return N, np.stack([dxi, deta], axis=1)
+
+def t6_B_batch(nodes, elems, workers=None):
+    """Strain-displacement matrices of 6-node triangles at the T6_GAUSS points, B (m,3,3,12), and
+    the integration weights w·|det J| (m,3), computed in element blocks."""
+    elems=np.asarray(elems); pts,w=T6_GAUSS; _,dN=t6_shape(pts); g=len(w)
+    B=np.zeros((len(elems),g,3,12)); W=np.empty((len(elems),g))
+    def block(s):
+        J=np.einsum('gan,enc->egac', dN, nodes[elems[s]])
+        det=J[...,0,0]*J[...,1,1]-J[...,0,1]*J[...,1,0]
+        if np.any(np.isclose(det,0)): raise ValueError('Degenerate triangle')
+        Ji=np.stack([np.stack([J[...,1,1], -J[...,0,1]], -1), np.stack([-J[...,1,0], J[...,0,0]], -1)], -2)/det[...,None,None]
+        d=np.einsum('egca,gan->egcn', Ji, dN)   # (dN/dx, dN/dy)
+        Bs=B[s]; Bs[...,0,0::2]=d[:,:,0]; Bs[...,1,1::2]=d[:,:,1]; Bs[...,2,0::2]=d[:,:,1]; Bs[...,2,1::2]=d[:,:,0]
+        W[s]=w*np.abs(det)
+    map_blocks(block, len(elems), workers)
+    return B, W
+
+def element_B_batch(nodes, elems, workers=None):
+    """tri_B_batch for 3-node, t6_B_batch for 6-node elements."""
+    return (t6_B_batch if np.shape(elems)[1]==6 else tri_B_batch)(nodes, elems, workers)
+
+def element_dofs(elems):
+    elems=np.asarray(elems, dtype=int); dof=np.empty((elems.shape[0],2*elems.shape[1]), dtype=int)
+    dof[:,0::2]=2*elems; dof[:,1::2]=2*elems+1
+    return dof
+
+def coo_indices(elems):
+    """Row/column index arrays matching ke.ravel() for every element."""
+    dof=element_dofs(elems); k=dof.shape[1]
+    return np.repeat(dof,k,axis=1).ravel(), np.tile(dof,(1,k)).ravel()
+
+def element_stiffness(B, A, D, t_in, mat_ids=None):
+    """t·A·BᵀDB per element. D is one (3,3) matrix, or a (k,3,3) stack indexed by mat_ids
+    (each material's D is applied to its elements as one batch). Gauss-point B (m,g,3,n) with
+    weights A (m,g) are summed over the points."""
+    if B.ndim==4: return sum(element_stiffness(B[:,g], A[:,g], D, t_in, mat_ids) for g in range(B.shape[1]))
+    D=np.asarray(D, dtype=float)
+    if D.ndim==2: return t_in*A[:,None,None]*(B.transpose(0,2,1)@(D@B))
+    if mat_ids is None: raise ValueError('mat_ids is required with one D matrix per material')
+    ke=np.empty((len(B),B.shape[2],B.shape[2]))
+    for k in np.unique(mat_ids):
+        sel=mat_ids==k; ke[sel]=element_stiffness(B[sel], A[sel], D[k], t_in)
+    return ke
+
+def assemble_K_linear(nodes, elems, D, t_in, BA=None, mat_ids=None, workers=None):
+    """Sparse CSR global stiffness of 3- or 6-node triangles; pass BA=(B,A) from element_B_batch
+    to reuse element geometry, and a (k,3,3) D stack with per-element mat_ids for multi-material
+    meshes.
+
+    Element matrices and their COO indices are computed per element block on `workers` threads
+    and written in element order, so K does not depend on the worker count."""
+    n=nodes.shape[0]; elems=np.asarray(elems); B,A=BA if BA is not None else element_B_batch(nodes, elems, workers)
+    mat_ids=None if mat_ids is None else np.asarray(mat_ids)
+    kk=(2*elems.shape[1])**2; data=np.empty(len(elems)*kk); rows=np.empty(len(data), dtype=int); cols=np.empty_like(rows)
+    def block(s):
+        o=slice(s.start*kk, s.stop*kk)
+        data[o]=element_stiffness(B[s], A[s], D, t_in, None if mat_ids is None else mat_ids[s]).ravel()
+        rows[o],cols[o]=coo_indices(elems[s])
+    map_blocks(block, len(elems), workers)
+    return sp.coo_matrix((data,(rows,cols)), shape=(2*n,2*n)).tocsr()
 
 def strain_from_u(nodes, tri, u):
     xy=nodes[tri]; B,A=tri_B_matrix(xy)
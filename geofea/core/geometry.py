@@ -1,21 +1,43 @@
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from geofea.core.materials.elastic import LinearElastic
 Point = Tuple[float, float]
 
+def circle_points(center: Point, r: float, n: int=64) -> List[Point]:
+    """Counter-clockwise n-gon inscribed in a circle (the discretisation used by the Circle tool)."""
+    th=np.linspace(0, 2*np.pi, n, endpoint=False)
+    return [(center[0]+r*np.cos(t), center[1]+r*np.sin(t)) for t in th]
+
 @dataclass
 class PolyRegion:
     name: str
     outer: List[Point]
     holes: List[List[Point]] = field(default_factory=list)
     material: str = "Elastic"
+    max_area: Optional[float] = None
 
 @dataclass
 class GeometryModel:
     regions: List[PolyRegion] = field(default_factory=list)
+    materials: Dict[str, LinearElastic] = field(default_factory=lambda: {"Elastic": LinearElastic(30.0, 0.2)})
 
     def add_polygon(self, name: str, pts: List[Point], material: str='Elastic'):
         if len(pts) < 3:
             raise ValueError("Polygon must have at least 3 points")
         self.regions.append(PolyRegion(name=name, outer=list(pts), material=material))
+
+    def region(self, name: str) -> PolyRegion:
+        for r in self.regions:
+            if r.name == name: return r
+        raise KeyError(name)
+
+    def material_ids(self, region_ids):
+        """Per-element index into list(self.materials) from per-element region indices."""
+        names = list(self.materials)
+        for r in self.regions:
+            if r.material not in self.materials: raise KeyError(f"Region {r.name!r} uses undefined material {r.material!r}")
+        lut = np.array([names.index(r.material) for r in self.regions], dtype=int)
+        return lut[np.asarray(region_ids, dtype=int)]
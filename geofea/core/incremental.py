@@ -0,0 +1,129 @@
+"""Incremental remeshing and reassembly: only regions whose boundary or size target changed are
+remeshed, and only their element stiffness is recomputed.
+
+Every region is meshed on its own (triangle with 'YY', so no points are added on its boundary)
+from a boundary that is discretised up front: each interface edge is split into equal parts
+sized by the finer of the two regions it separates, so neighbouring meshes share the same
+interface nodes and the merged mesh is conforming. A region's mesh is keyed by its oriented,
+discretised boundary and its max_area; editing one region therefore remeshes that region and,
+where their common edges changed, its neighbours. Stiffness blocks are kept per region mesh,
+material and thickness in region-local numbering and merged into the global K.
+"""
+import hashlib
+import threading
+import numpy as np
+import scipy.sparse as sp
+from geofea.core.fem import tri_B_batch, assemble_K_linear
+from geofea.core.mesher_triangle import _triangle, geometry_pslg, region_of, mesh_geometry
+
+def _key(*arrays, extra=()):
+    h=hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a=np.ascontiguousarray(a); h.update(f'{a.dtype.str}{a.shape}'.encode()); h.update(a.tobytes())
+    h.update(repr(tuple(extra)).encode())
+    return h.hexdigest()
+
+def _edge_size(area):
+    """Side of the equilateral triangle of the given area."""
+    return np.sqrt(4.0*area/np.sqrt(3.0))
+
+def region_boundaries(geom, max_area=None, tr=None):
+    """Discretised region outlines from a coarse triangulation of the geometry PSLG.
+
+    Returns the points (k,2), per region index its boundary as directed point-id segments with
+    the region on the left, and the max_area used for each region. Interface edges are split
+    evenly, sized by the smaller max_area of the two sides."""
+    tr=tr or _triangle(); V,S=geometry_pslg(geom)
+    T=tr.triangulate({'vertices':V, 'segments':S}, 'p'); X=T['vertices']; tri=T['triangles'].astype(int)
+    xy=X[tri]; cw=(xy[:,1,0]-xy[:,0,0])*(xy[:,2,1]-xy[:,0,1])-(xy[:,2,0]-xy[:,0,0])*(xy[:,1,1]-xy[:,0,1])<0
+    tri[cw]=tri[cw][:,::-1]; c=X[tri].mean(axis=1); lab=region_of(c, geom); n=len(X)
+    # directed half-edges a->b (owner on the left) and the triangle on the other side
+    a=tri.ravel(); b=tri[:,[1,2,0]].ravel(); t=np.repeat(np.arange(len(tri)),3)
+    hk=a*n+b; o=np.argsort(hk); j=np.searchsorted(hk[o], b*n+a); j=np.minimum(j, len(o)-1)
+    twin=np.where(hk[o][j]==b*n+a, t[o][j], -1); lt=lab[t]; lo=np.where(twin>=0, lab[twin], -1)
+    on=(lt>=0)&(lt!=lo); a,b,lt,lo=a[on],b[on],lt[on],lo[on]
+    area=[r.max_area if r.max_area is not None else max_area for r in geom.regions]
+    # one split per undirected edge so both sides get identical interface points
+    ea=np.minimum(a,b); eb=np.maximum(a,b); und,inv=np.unique(np.column_stack([ea,eb]), axis=0, return_inverse=True)
+    inv=inv.ravel(); h=np.full(len(und), np.inf)
+    for side in (lt, lo):
+        sz=np.array([_edge_size(area[i]) if i>=0 and area[i] is not None else np.inf for i in side])
+        np.minimum.at(h, inv, sz)
+    L=np.linalg.norm(X[und[:,1]]-X[und[:,0]], axis=1)
+    parts=np.where(np.isfinite(h), np.maximum(1, np.ceil(L/np.where(np.isfinite(h), h, 1.0)-1e-9)), 1).astype(int)
+    first=n+np.concatenate([[0], np.cumsum(parts-1)]); pts=[X]
+    for (p,q),k in zip(und, parts):
+        if k>1: s=np.arange(1,k)[:,None]/k; pts.append(X[p]*(1-s)+X[q]*s)
+    P=np.vstack(pts); out={}
+    for i in np.unique(lt):
+        segs=[]
+        for e in np.flatnonzero(lt==i):
+            u=inv[e]; mid=list(range(first[u], first[u]+parts[u]-1))
+            if a[e]>b[e]: mid=mid[::-1]
+            chain=[a[e]]+mid+[b[e]]; segs+=list(zip(chain[:-1], chain[1:]))
+        out[int(i)]=np.array(segs, dtype=int).reshape(-1,2)
+    return P, out, area
+
+class IncrementalMesher:
+    """Region meshes and stiffness blocks kept between runs (one per GUI session or study).
+
+    mesh() returns {'nodes','elems','region_ids','parts'}; each part describes one region's
+    elements (a contiguous slice), its local mesh and the local->global node map, and whether
+    it was reused. stiffness() merges cached per-part blocks into the global K. Entries not
+    used by the latest mesh are dropped, so the cache holds one model. Thread-safe."""
+    def __init__(self):
+        self._meshes={}; self._blocks={}; self._lock=threading.Lock()
+
+    def mesh(self, geom, max_area=None):
+        if not geom.regions: raise ValueError('Geometry has no regions')
+        tr=_triangle()
+        if tr is None:
+            nodes,elems,rid=mesh_geometry(geom, max_area=max_area)
+            return {'nodes':nodes, 'elems':elems, 'region_ids':rid, 'parts':None}
+        P,bnd,area=region_boundaries(geom, max_area, tr)
+        with self._lock:
+            parts=[]; keep={}
+            for i,segs in sorted(bnd.items()):
+                ids=np.unique(segs); xy=P[ids]; o=np.lexsort((xy[:,1], xy[:,0])); ids=ids[o]; xy=xy[o]
+                loc=np.empty(len(P), dtype=int); loc[ids]=np.arange(len(ids)); s=loc[segs]; s=s[np.lexsort((s[:,1], s[:,0]))]
+                k=_key(xy, s, extra=(area[i],)); hit=self._meshes.get(k)
+                if hit is None:
+                    A={'vertices':xy, 'segments':s}
+                    # hole seeds: centroids of the boundary-only triangulation outside the region
+                    C=tr.triangulate(A, 'p'); c=C['vertices'][C['triangles']].mean(axis=1); out=region_of(c, geom)!=i
+                    if out.any(): A['holes']=c[out]
+                    opts='pqYY'+(f'a{float(area[i])}' if area[i] is not None else '')
+                    T=tr.triangulate(A, opts); hit=(T['vertices'], T['triangles'].astype(int), ids.copy())
+                keep[k]=hit; ln,le,_=hit
+                if len(le): parts.append({'region':i, 'key':k, 'nodes':ln, 'elems':le, 'boundary':ids, 'reused':k in self._meshes})
+            self._meshes=keep
+        # global numbering: used boundary points first, then each part's interior nodes
+        used=np.unique(np.concatenate([p['boundary'] for p in parts])); g=np.full(len(P), -1); g[used]=np.arange(len(used))
+        nodes=[P[used]]; elems=[]; rid=[]; off=len(used); start=0
+        for p in parts:
+            nb=len(p['boundary']); ni=len(p['nodes'])-nb
+            p['l2g']=np.concatenate([g[p['boundary']], off+np.arange(ni)]); off+=ni
+            nodes.append(p['nodes'][nb:]); elems.append(p['l2g'][p['elems']]); rid.append(np.full(len(p['elems']), p['region']))
+            p['slice']=slice(start, start+len(p['elems'])); start+=len(p['elems'])
+        return {'nodes':np.vstack(nodes), 'elems':np.vstack(elems), 'region_ids':np.concatenate(rid), 'parts':parts}
+
+    def stiffness(self, mesh, D, t_in, mat_ids=None, workers=None):
+        """Global K (CSR) and (B, A) of a mesh from mesh(), recomputing only parts whose mesh,
+        material or thickness changed; also returns the number of parts reused."""
+        D=np.asarray(D, dtype=float); n=len(mesh['nodes']); keep={}; reused=0
+        rows=[]; cols=[]; data=[]; B=[]; A=[]
+        with self._lock:
+            for p in mesh['parts']:
+                Dp=D if D.ndim==2 else D[int(np.asarray(mat_ids)[p['slice'].start])]
+                k=(p['key'], Dp.tobytes(), float(t_in)); hit=self._blocks.get(k)
+                if hit is None:
+                    BA=tri_B_batch(p['nodes'], p['elems'], workers)
+                    Kl=assemble_K_linear(p['nodes'], p['elems'], Dp, t_in, BA=BA, workers=workers).tocoo()
+                    hit=(Kl.row, Kl.col, Kl.data, BA)
+                else: reused+=1
+                keep[k]=hit; r,c,d,(b,a)=hit; dof=np.empty(2*len(p['l2g']), dtype=int)
+                dof[0::2]=2*p['l2g']; dof[1::2]=2*p['l2g']+1
+                rows.append(dof[r]); cols.append(dof[c]); data.append(d); B.append(b); A.append(a)
+            self._blocks=keep
+        K=sp.coo_matrix((np.concatenate(data),(np.concatenate(rows),np.concatenate(cols))), shape=(2*n,2*n)).tocsr()
+        return K, (np.concatenate(B), np.concatenate(A)), reused
@@ -1,37 +1,45 @@
 
 import numpy as np
+from geofea.core.spatial import segment_distances
+from geofea.core.topology import edge_table
 
 def boundary_edges(elems):
-    from collections import defaultdict
-    count = defaultdict(int)
-    for tri in elems:
-        for a,b in [(tri[0],tri[1]),(tri[1],tri[2]),(tri[2],tri[0])]:
-            a2,b2=(a,b) if a<b else (b,a); count[(a2,b2)]+=1
-    return np.array([k for k,v in count.items() if v==1], dtype=int)
+    edges,_,cnt=edge_table(elems)
+    return edges[cnt==1]
 
 def point_to_segment_distance(p,a,b):
     ap=p-a; ab=b-a; ab2=ab.dot(ab)+1e-30; t=max(0,min(1,ap.dot(ab)/ab2)); proj=a+t*ab; return float(np.linalg.norm(p-proj))
 
-def edges_near_polyline(nodes, edges, polyline, tol_in=2.0):
+def _same_edges(index, edges):
+    e=index.edges
+    return e is edges or (e is not None and e.shape==np.shape(edges) and np.array_equal(e, edges))
+
+def edges_near_polyline(nodes, edges, polyline, tol_in=2.0, index=None):
+    """Boundary edges whose midpoint is within tol_in of the polyline; pass a SpatialIndex built
+    on the same nodes and edges to reuse it."""
     if len(polyline)<2: return np.array([],dtype=int)
-    P=np.array(polyline,float); mids=(nodes[edges[:,0]]+nodes[edges[:,1]])/2.0; sel=[]
-    for i,m in enumerate(mids):
-        dmin=1e18
-        for j in range(len(P)-1):
-            a=P[j]; b=P[j+1]; d=point_to_segment_distance(m,a,b); dmin=min(dmin,d)
-        if dmin<=tol_in: sel.append(i)
-    return np.array(sel,dtype=int)
+    if index is not None:
+        if len(index.nodes)!=len(nodes) or not _same_edges(index, edges): raise ValueError('SpatialIndex was built on different edges')
+        return index.edges_near_polyline(polyline, tol_in)
+    P=np.array(polyline,float); mids=(nodes[edges[:,0]]+nodes[edges[:,1]])/2.0; dmin=np.full(len(mids),1e18)
+    for a,b in zip(P[:-1],P[1:]): dmin=np.minimum(dmin, segment_distances(mids,a,b))
+    return np.flatnonzero(dmin<=tol_in)
 
 def assemble_line_traction(nodes, edges, edges_idx, tx_kip_ft, ty_kip_ft):
+    """Consistent nodal forces of a uniform traction on the selected edges: 2-node edges (a,b)
+    share L/2 per node, 3-node edges (a,b,mid) of 6-node meshes L/6, L/6 and 2L/3."""
     qx=tx_kip_ft/12.0; qy=ty_kip_ft/12.0  # kip/ft -> kip/in
-    F=np.zeros(2*nodes.shape[0])
-    for i in edges_idx:
-        a,b=edges[i]; pa=nodes[a]; pb=nodes[b]; L=float(np.linalg.norm(pb-pa))
-        Fx=qx*L/2.0; Fy=qy*L/2.0
-        F[2*a]+=Fx; F[2*b]+=Fx; F[2*a+1]+=Fy; F[2*b+1]+=Fy
+    n=nodes.shape[0]; k=np.shape(edges)[1]; e=edges[np.asarray(edges_idx,dtype=int)].reshape(-1,k)
+    L=np.linalg.norm(nodes[e[:,1]]-nodes[e[:,0]], axis=1); ends=e.ravel()
+    share=np.outer(L, [0.5,0.5] if k==2 else [1/6,1/6,2/3]).ravel()
+    F=np.zeros(2*n)
+    F[0::2]=np.bincount(ends, weights=qx*share, minlength=n); F[1::2]=np.bincount(ends, weights=qy*share, minlength=n)
     return F
 
-def assemble_point_load(nodes, pt, Fx_kip, Fy_kip):
-    dif=nodes-np.array(pt,float); i=int(np.argmin(np.sum(dif*dif,axis=1)))
+def assemble_point_load(nodes, pt, Fx_kip, Fy_kip, index=None):
+    if index is not None:
+        if len(index.nodes)!=len(nodes): raise ValueError('SpatialIndex was built on different nodes')
+        i=index.nearest_node(pt)
+    else: dif=nodes-np.array(pt,float); i=int(np.argmin(np.sum(dif*dif,axis=1)))
     F=np.zeros(2*nodes.shape[0]); F[2*i]+=Fx_kip; F[2*i+1]+=Fy_kip
     return F,i
@@ -0,0 +1,139 @@
+"""Elastic–perfectly plastic Mohr–Coulomb material (plane strain) with an optional tension cut-off.
+
+Stresses are tension-positive rows (sxx, syy, sxy, szz). The return mapping works on the
+principal stresses (the in-plane pair and szz), where every yield surface is a plane:
+
+    kσi - σj ≤ σc    Mohr–Coulomb, for each ordered pair i ≠ j (six sextants)
+                     k = (1+sinφ)/(1-sinφ), σc = 2c·cosφ/(1-sinφ)
+    σi ≤ σt          tension cut-off (Rankine planes, when `tension` is given)
+
+with flow directions from the plastic potential (dilation ψ; ψ = φ is associated). The return
+is an active-set solve over at most three planes, closed-form per active set since the planes
+and the elastic matrix are constant, and vectorised over all points that share one; edges, the
+apex and cut-off corners need no special cases. The few points whose active-set walk cycles
+(beyond the apex) are settled by trying every set of planes, then the vertex. Principal
+directions are kept, as isotropic elasticity and a principal-space return require.
+"""
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+from geofea.core.materials.elastic import LinearElastic
+
+def principal_3d(sig):
+    """In-plane principal values a ≥ b, the angle of a from +x, and szz, for rows (sxx,syy,sxy,szz)."""
+    sx,sy,txy,sz=sig.T; c=0.5*(sx+sy); r=np.hypot(0.5*(sx-sy), txy)
+    return c+r, c-r, 0.5*np.arctan2(2*txy, sx-sy), sz
+
+def plane_strain_D4(E, nu):
+    """Plane-strain elasticity mapping (exx, eyy, γxy) to (sxx, syy, sxy, szz), (4,3)."""
+    lam=E*nu/((1+nu)*(1-2*nu)); G=E/(2*(1+nu))
+    return np.array([[lam+2*G, lam, 0], [lam, lam+2*G, 0], [0, 0, G], [lam, lam, 0]])
+
+def principal_D(E, nu):
+    """Isotropic elasticity between principal stresses and strains (3,3)."""
+    lam=E*nu/((1+nu)*(1-2*nu)); G=E/(2*(1+nu))
+    return lam*np.ones((3,3))+2*G*np.eye(3)
+
+def from_principal_3d(a, b, theta, sz):
+    c=np.cos(theta); s=np.sin(theta)
+    return np.column_stack([a*c*c+b*s*s, a*s*s+b*c*c, (a-b)*s*c, sz])
+
+@lru_cache(maxsize=64)
+def _planes(c, phi, psi, tension):
+    """Normals, flow directions and limits of the six Mohr–Coulomb and three tension planes."""
+    sp=np.sin(np.radians(phi)); k=(1+sp)/(1-sp); m=(1+np.sin(np.radians(psi)))/(1-np.sin(np.radians(psi)))
+    sc=2*c*np.cos(np.radians(phi))/(1-sp)
+    ij=np.array([(0,2),(1,2),(0,1),(1,0),(2,0),(2,1)]); r=np.arange(6)
+    A=np.zeros((6,3)); A[r,ij[:,0]]=k; A[r,ij[:,1]]=-1
+    Bf=np.zeros((6,3)); Bf[r,ij[:,0]]=m; Bf[r,ij[:,1]]=-1; lim=np.full(6, sc)
+    if tension is not None: A=np.vstack([A, np.eye(3)]); Bf=np.vstack([Bf, np.eye(3)]); lim=np.r_[lim, [tension]*3]
+    return A, Bf, lim
+
+@lru_cache(maxsize=64)
+def _subsets(E, nu, c, phi, psi, tension):
+    """Every non-degenerate set of at most three planes with its inverse plastic matrix."""
+    A,Bf,lim=_planes(c, phi, psi, tension); G=A@(Bf@principal_D(E, nu)).T; sets=[]
+    for n in (1,2,3):
+        for ids in combinations(range(len(lim)), n):
+            ids=np.array(ids); g=G[np.ix_(ids,ids)]
+            if np.linalg.matrix_rank(A[ids])==n and abs(np.linalg.det(g))>1e-12*np.abs(g).max()**n:
+                sets.append((ids, np.linalg.inv(g)))
+    return sets
+
+class MohrCoulomb(LinearElastic):
+    """Mohr–Coulomb soil: E (ksi), ν, cohesion c (ksi), friction φ and dilation ψ (degrees),
+    optional tensile strength `tension` (ksi, ≥ 0) and unit weight (pcf) for body forces."""
+    plastic = True
+
+    def __init__(self, E_ksi: float, nu: float, c_ksi: float, phi_deg: float, psi_deg: float=0.0,
+                 tension=None, unit_weight_pcf: float=0.0):
+        super().__init__(E_ksi, nu, False)
+        if c_ksi<0 or not 0<=phi_deg<90 or not 0<=psi_deg<=phi_deg: raise ValueError('Mohr–Coulomb needs c ≥ 0, 0 ≤ ψ ≤ φ < 90°')
+        if tension is not None and tension<0: raise ValueError('Tensile strength must be ≥ 0')
+        self.c=c_ksi; self.phi=phi_deg; self.psi=psi_deg; self.tension=tension; self.unit_weight=unit_weight_pcf
+
+    def reduced(self, F):
+        """Copy with strength reduced by F (shear-strength reduction): c/F, tanφ/F, ψ ≤ reduced φ;
+        the tension cut-off is scaled like c."""
+        phi=np.degrees(np.arctan(np.tan(np.radians(self.phi))/F))
+        return MohrCoulomb(self.E, self.nu, self.c/F, phi, min(self.psi, phi),
+                           None if self.tension is None else self.tension/F, self.unit_weight)
+
+    def planes(self):
+        """Yield-plane normals A (p,3), flow directions Bf (p,3) and limits (p,) in principal space."""
+        return _planes(self.c, self.phi, self.psi, self.tension)
+
+    def vertex(self):
+        """Hydrostatic tip of the yield surface: the Mohr–Coulomb apex c·cotφ or the tension cut-off."""
+        A,_,lim=self.planes(); k=A[0,0]
+        tip=lim[0]/(k-1) if k>1 else np.inf
+        return min(tip, self.tension) if self.tension is not None else tip
+
+    def yield_function(self, sig):
+        """Largest plane value per stress row (≤ 0 inside the elastic domain)."""
+        a,b,_,sz=principal_3d(sig); s=-np.sort(-np.column_stack([a,b,sz]), axis=1); A,_,lim=self.planes()
+        return (s@A.T-lim).max(axis=1)
+
+    def return_map(self, sig, max_sets=6):
+        """Stress rows (n,4) projected back onto the yield surface; returns the new stresses and a
+        mask of the rows that yielded."""
+        sig=np.asarray(sig, float); a,b,th,sz=principal_3d(sig); P=np.column_stack([a,b,sz])
+        A,Bf,lim=self.planes(); R=Bf@principal_D(self.E, self.nu)   # rows: stress change per unit multiplier
+        tol=1e-10*(np.abs(lim).max()+np.abs(P).max(axis=1)+1e-30)
+        f=P@A.T-lim; yielded=(f>tol[:,None]).any(axis=1); idx=np.flatnonzero(yielded)
+        if len(idx):
+            St=P[idx]; Ft=f[idx]; tl=tol[idx]; Snew=St.copy(); bits=1<<np.arange(len(lim))
+            sets={int(bits[i].sum()): (i,g) for i,g in _subsets(self.E, self.nu, self.c, self.phi, self.psi, self.tension)}
+            act=np.zeros(Ft.shape, dtype=bool); act[np.arange(len(idx)), np.argmax(Ft, axis=1)]=True
+            todo=np.ones(len(idx), dtype=bool); hard=np.zeros(len(idx), dtype=bool)
+            for _ in range(max_sets):   # active set: start from the most violated plane, drop/add one at a time
+                rows=np.flatnonzero(todo)
+                if not len(rows): break
+                key=act[rows]@bits; order=np.argsort(key, kind='stable'); key=key[order]
+                cut=np.flatnonzero(np.diff(key))+1
+                for r,kk in zip(np.split(rows[order], cut), key[np.r_[0, cut]]):
+                    if int(kk) not in sets: hard[r]=True; todo[r]=False; continue
+                    ids,Gi=sets[int(kk)]
+                    dl=Ft[r][:,ids]@Gi.T; neg=dl.min(axis=1)<0
+                    if neg.any():
+                        act[r[neg], ids[np.argmin(dl[neg], axis=1)]]=False; r=r[~neg]; dl=dl[~neg]
+                    Snew[r]=St[r]-dl@R[ids]
+                    fv=Snew[r]@A.T-lim; bad=(fv>tl[r,None])&~act[r]; add=bad.any(axis=1)
+                    act[r[add], np.argmax(np.where(bad, fv, -np.inf)[add], axis=1)]=True
+                    todo[r[~add]]=False
+            hard|=todo
+            if hard.any(): Snew[hard]=self._exhaustive(St[hard], Ft[hard], tl[hard], R)
+            P=P.copy(); P[idx]=Snew
+        return from_principal_3d(P[:,0], P[:,1], th, P[:,2]), yielded
+
+    def _exhaustive(self, St, Ft, tl, R):
+        """Return of the rows the active-set walk could not settle: the first admissible set of
+        planes (non-negative multipliers, no plane violated), else the vertex."""
+        A,_,lim=self.planes(); out=np.full_like(St, self.vertex()); left=np.ones(len(St), dtype=bool)
+        for ids,Gi in _subsets(self.E, self.nu, self.c, self.phi, self.psi, self.tension):
+            r=np.flatnonzero(left)
+            if not len(r): break
+            dl=Ft[r][:,ids]@Gi.T; S=St[r]-dl@R[ids]
+            ok=(dl>=0).all(axis=1)&((S@A.T-lim)<=1e3*tl[r,None]).all(axis=1)
+            out[r[ok]]=S[ok]; left[r[ok]]=False
+        return out
@@ -1,35 +1,212 @@
 
 import numpy as np
 
-def mesh_polygon(vertices, max_area=None, quality=30):
-    """Constrained Delaunay via `triangle` if available; structured fallback otherwise."""
+def _triangle():
     try:
         import triangle as tr
     except Exception:
         tr = None
+    return tr
+
+# triangle's 'o2' puts the mid-side node opposite corner k in column 3+k; ours follow edges 0-1, 1-2, 2-0
+_O2_ORDER = [0,1,2,5,3,4]
+
+def quadratic_mesh(nodes, elems):
+    """6-node triangles from 3-node ones: one new node at the midpoint of every edge, appended
+    after the existing nodes; columns 3-5 are the mid-sides of edges 0-1, 1-2 and 2-0."""
+    from geofea.core.topology import edge_table
+    nodes=np.asarray(nodes, float); elems=np.asarray(elems, dtype=int)
+    edges,ee,_=edge_table(elems)
+    return np.vstack([nodes, 0.5*(nodes[edges[:,0]]+nodes[edges[:,1]])]), np.hstack([elems, len(nodes)+ee])
+
+def mesh_polygon(vertices, max_area=None, quality=30, order=1):
+    """Constrained Delaunay via `triangle` if available; structured fallback otherwise.
+    order=2 gives 6-node triangles (triangle's 'o2', or quadratic_mesh on the fallback)."""
+    tr=_triangle()
     poly = np.array(vertices, dtype=float)
+    n=len(poly)
+    segs=np.column_stack([np.arange(n), np.roll(np.arange(n), -1)])
     if tr is None:
-        # Fallback: structured mesh + inside cull
-        x0,y0 = poly.min(axis=0); x1,y1 = poly.max(axis=0)
-        nx=ny=60
-        xs=np.linspace(x0,x1,nx+1); ys=np.linspace(y0,y1,ny+1)
-        X,Y=np.meshgrid(xs,ys); nodes=np.column_stack([X.ravel(),Y.ravel()])
-        def nid(i,j): return j*(nx+1)+i
-        elems=[]
-        for j in range(ny):
-            for i in range(nx):
-                n1=nid(i,j); n2=nid(i+1,j); n3=nid(i,j+1); n4=nid(i+1,j+1)
-                elems.append([n1,n2,n4]); elems.append([n1,n4,n3])
         from matplotlib.path import Path
-        P=Path(poly); cent=nodes[np.array(elems)].mean(axis=1)
-        mask=P.contains_points(cent)
-        tris=np.array(elems, dtype=int)[mask]
-        return nodes, tris
+        P=Path(poly); nodes,elems,_=structured_mesh(poly, segs, lambda c: np.where(P.contains_points(c),0,-1), max_area)
+        return quadratic_mesh(nodes, elems) if order==2 else (nodes, elems)
     # Triangle path
-    n=len(poly)
-    segs=np.column_stack([np.arange(n), np.roll(np.arange(n), -1)])
     A={'vertices':poly, 'segments':segs}
     opts='pq'
     if max_area is not None: opts+=f'a{float(max_area)}'
+    if order==2: opts+='o2'
     T=tr.triangulate(A, opts)
-    return T['vertices'], T['triangles']
+    return T['vertices'], T['triangles'][:,_O2_ORDER] if order==2 else T['triangles']
+
+def _closest_on_segments(P, A, B):
+    """Closest point on any of the segments A-B (s,2) for each point P (k,2), and its distance."""
+    ab=B-A; ab2=np.einsum('ij,ij->i', ab, ab)+1e-30
+    t=np.clip(np.einsum('ksj,sj->ks', P[:,None,:]-A[None], ab)/ab2, 0, 1)
+    Q=A[None]+t[...,None]*ab[None]; d=np.linalg.norm(P[:,None,:]-Q, axis=2); j=np.argmin(d, axis=1)
+    k=np.arange(len(P)); return Q[k,j], d[k,j]
+
+def _thickness(V, S):
+    """Narrowest gap between facing segments: the distance from each segment midpoint to every
+    segment it shares no vertex with and projects strictly inside (inf if there is none)."""
+    A,B=V[S[:,0]],V[S[:,1]]; M=0.5*(A+B); ab=B-A; ab2=np.einsum('ij,ij->i', ab, ab)+1e-30
+    t=np.einsum('ksj,sj->ks', M[:,None,:]-A[None], ab)/ab2
+    d=np.linalg.norm(M[:,None,:]-(A[None]+t[...,None]*ab[None]), axis=2)
+    apart=(S[:,None,0]!=S[None,:,0])&(S[:,None,0]!=S[None,:,1])&(S[:,None,1]!=S[None,:,0])&(S[:,None,1]!=S[None,:,1])
+    d=np.where(apart&(t>0)&(t<1), d, np.inf)
+    return float(d.min()) if d.size else np.inf
+
+def _signed_area2(nodes, elems):
+    xy=nodes[elems]; d1=xy[:,1]-xy[:,0]; d2=xy[:,2]-xy[:,0]
+    return d1[:,0]*d2[:,1]-d2[:,0]*d1[:,1]
+
+def structured_mesh(V, S, classify, max_area=None, default_divisions=60):
+    """Grid fallback mesher: right-triangle grid over the bounding box of vertices V, with triangles
+    of max_area/2 (default: default_divisions cells along the longer side) and at least two cells
+    across the narrowest part of the geometry. classify(centroids) gives a label per element (-1
+    drops it). Unused nodes are removed, and nodes on the mesh boundary or between labels are
+    snapped onto the segments S (vertex pairs) where that keeps every element valid and no larger
+    than max_area. Returns nodes, elems, labels."""
+    from geofea.core.topology import edge_table
+    V=np.asarray(V, float); S=np.asarray(S, dtype=int).reshape(-1,2)
+    (x0,y0),(x1,y1)=V.min(axis=0), V.max(axis=0); L=max(x1-x0, y1-y0)
+    # half-size cells leave snapped boundary elements room to grow without passing max_area
+    h=np.sqrt(float(max_area)) if max_area is not None else L/default_divisions
+    if len(S): h=max(min(h, 0.5*_thickness(V, S)), L/(10*default_divisions))
+    nx=max(1,int(np.ceil((x1-x0)/h))); ny=max(1,int(np.ceil((y1-y0)/h)))
+    X,Y=np.meshgrid(np.linspace(x0,x1,nx+1), np.linspace(y0,y1,ny+1)); nodes=np.column_stack([X.ravel(),Y.ravel()])
+    I,J=np.meshgrid(np.arange(nx), np.arange(ny)); n1=(J*(nx+1)+I).ravel(); n2=n1+1; n3=n1+nx+1; n4=n3+1
+    elems=np.stack([np.column_stack([n1,n2,n4]), np.column_stack([n1,n4,n3])], axis=1).reshape(-1,3)
+    lab=np.asarray(classify(nodes[elems].mean(axis=1)), dtype=int); keep=lab>=0; elems=elems[keep]; lab=lab[keep]
+    if len(elems)==0: return np.zeros((0,2)), np.zeros((0,3), dtype=int), lab
+    used,inv=np.unique(elems, return_inverse=True); nodes=nodes[used]; elems=inv.reshape(elems.shape)
+    # nodes to snap: on boundary edges or on edges between differently labelled elements
+    edges,ee,cnt=edge_table(elems); owner=np.repeat(np.arange(len(elems)),3)
+    lab_min=np.full(len(edges), np.iinfo(int).max); lab_max=np.full(len(edges), -1)
+    np.minimum.at(lab_min, ee.ravel(), lab[owner]); np.maximum.at(lab_max, ee.ravel(), lab[owner])
+    iface=np.unique(edges[(cnt==1)|(lab_min!=lab_max)])
+    if len(iface)==0 or len(S)==0: return nodes, elems, lab
+    A,B=V[S[:,0]],V[S[:,1]]; Q,d=_closest_on_segments(nodes[iface], A, B)
+    # geometry corners go to their closest interface node
+    dv=np.linalg.norm(nodes[iface][None]-V[:,None], axis=2); j=np.argmin(dv, axis=1); ok=dv[np.arange(len(V)),j]<=h
+    Q[j[ok]]=V[ok]; d[j[ok]]=0.0; corner=np.zeros(len(iface), dtype=bool); corner[j[ok]]=True
+    # greedy passes, nodes left outside the geometry first, then inside nodes nearest the boundary;
+    # a move is kept only if every incident element stays between 10% of its grid area and
+    # max_area, except ears (two boundary edges) which may flatten onto the boundary and are then
+    # dropped; moves rejected next to a node that has not moved yet are retried on the next pass
+    out=classify(nodes[iface])<0
+    order=np.lexsort((np.where(out, -d, d), ~(out|corner)))
+    order=order[(out|corner|(d<=h))[order]]
+    ptr=np.concatenate([[0], np.cumsum(np.bincount(elems.ravel(), minlength=len(nodes)))])
+    inc=np.argsort(elems.ravel(), kind='stable')//3; a_grid=_signed_area2(nodes, elems[:1])[0]
+    a_min=0.1*a_grid; a_max=2.0*float(max_area) if max_area is not None else 4.0*a_grid   # signed areas are doubled
+    ear=(cnt[ee]==1).sum(axis=1)>=2
+    for _ in range(3):
+        left=[]
+        for k in order:
+            i=iface[k]; old=nodes[i].copy(); nodes[i]=Q[k]; e=inc[ptr[i]:ptr[i+1]]
+            a=_signed_area2(nodes, elems[e])
+            if ((a<a_min)&~ear[e]).any() or a.min()<-1e-9*a_grid or a.max()>a_max: nodes[i]=old; left.append(k)
+        if len(left)==len(order): break
+        order=left
+    flat=ear&(_signed_area2(nodes, elems)<a_min)
+    if flat.any():
+        elems=elems[~flat]; lab=lab[~flat]; used,inv=np.unique(elems, return_inverse=True); nodes=nodes[used]; elems=inv.reshape(elems.shape)
+    return nodes, elems, lab
+
+def region_of(points, geom):
+    """Index of the region containing each point (later regions win overlaps); -1 outside or in a hole."""
+    from matplotlib.path import Path
+    rid=np.full(len(points), -1, dtype=int)
+    for i,r in enumerate(geom.regions):
+        inside=Path(np.asarray(r.outer, float)).contains_points(points)
+        for h in r.holes: inside&=~Path(np.asarray(h, float)).contains_points(points)
+        rid[inside]=i
+    return rid
+
+def _split_at_vertices(V, segs, tol):
+    from geofea.core.spatial import segment_distances
+    out=[]
+    for a,b in segs:
+        d=segment_distances(V, V[a], V[b]); ab=V[b]-V[a]; t=(V-V[a])@ab/(ab@ab)
+        on=np.flatnonzero((d<=tol)&(t>0)&(t<1)); on=on[(on!=a)&(on!=b)]
+        chain=[a]+list(on[np.argsort(t[on])])+[b]
+        out+=list(zip(chain[:-1], chain[1:]))
+    return np.array(out, dtype=int).reshape(-1,2)
+
+def geometry_pslg(geom, tol=None):
+    """Merged vertices/segments of every region outline and hole; shared and overlapping edges
+    become single segments split at each other's vertices."""
+    loops=[np.asarray(l, float) for r in geom.regions for l in [r.outer]+list(r.holes)]
+    pts=np.vstack(loops)
+    if tol is None: tol=1e-9*max(float(np.ptp(pts, axis=0).max()), 1.0)
+    _,first,inv=np.unique(np.round(pts/tol).astype(np.int64), axis=0, return_index=True, return_inverse=True)
+    V=pts[first]; inv=inv.ravel(); segs=[]; k=0
+    for l in loops:
+        ids=inv[k:k+len(l)]; k+=len(l); segs.append(np.column_stack([ids, np.roll(ids,-1)]))
+    S=np.sort(np.vstack(segs), axis=1); S=np.unique(S[S[:,0]!=S[:,1]], axis=0)
+    S=np.unique(np.sort(_split_at_vertices(V, S, 10*tol), axis=1), axis=0)
+    return V, S
+
+def _interior_point(tr, loops, accept):
+    """A point inside the area bounded by `loops` for which accept(points) holds, or None."""
+    V=np.vstack(loops); n=[len(l) for l in loops]; o=np.cumsum([0]+n[:-1])
+    S=np.vstack([np.column_stack([np.arange(k)+s, np.roll(np.arange(k),-1)+s]) for k,s in zip(n,o)])
+    T=tr.triangulate({'vertices':V, 'segments':S}, 'p'); xy=T['vertices'][T['triangles']]
+    c=xy.mean(axis=1); ok=accept(c)
+    if not ok.any(): return None
+    d1=xy[:,1]-xy[:,0]; d2=xy[:,2]-xy[:,0]; A=np.abs(d1[:,0]*d2[:,1]-d2[:,0]*d1[:,1])
+    return c[np.flatnonzero(ok)[np.argmax(A[ok])]]
+
+def _compact(nodes, elems):
+    used,inv=np.unique(elems, return_inverse=True)
+    return nodes[used], inv.reshape(elems.shape)
+
+def mesh_geometry(geom, max_area=None, quality=30, order=1):
+    """Mesh every region of a GeometryModel in one pass (conforming at shared boundaries, holes
+    left empty). Returns nodes, elems and the region index of each element; use
+    geom.material_ids() to turn the latter into material ids. PolyRegion.max_area overrides
+    max_area inside its region. order=2 gives 6-node triangles."""
+    if not geom.regions: raise ValueError('Geometry has no regions')
+    tr=_triangle()
+    V,S=geometry_pslg(geom)
+    if tr is None:
+        areas=[a for a in [max_area]+[r.max_area for r in geom.regions] if a is not None]
+        nodes,elems,rid=structured_mesh(V, S, lambda c: region_of(c, geom), max_area=min(areas) if areas else None)
+        return (*quadratic_mesh(nodes, elems), rid) if order==2 else (nodes, elems, rid)
+    regions=[]; holes=[]
+    for i,r in enumerate(geom.regions):
+        loops=[np.asarray(l, float) for l in [r.outer]+list(r.holes)]
+        p=_interior_point(tr, loops, lambda c, i=i: region_of(c, geom)==i)
+        a=r.max_area if r.max_area is not None else (max_area if max_area is not None else -1.0)
+        if p is not None: regions.append([p[0], p[1], i, a])
+        for h in r.holes:
+            q=_interior_point(tr, [np.asarray(h, float)], lambda c: region_of(c, geom)<0)
+            if q is not None: holes.append(q)
+    A={'vertices':V, 'segments':S}
+    if regions: A['regions']=np.array(regions, float)
+    if holes: A['holes']=np.array(holes, float)
+    opts='pq'
+    if regions: opts+='a'  # regional constraints already carry the global max_area as default
+    elif max_area is not None: opts+=f'a{float(max_area)}'
+    if order==2: opts+='o2'
+    T=tr.triangulate(A, opts); nodes,elems=T['vertices'], T['triangles']
+    if order==2: elems=elems[:,_O2_ORDER]
+    rid=region_of(nodes[elems[:,:3]].mean(axis=1), geom); keep=rid>=0
+    nodes,elems=_compact(nodes, elems[keep])
+    return nodes, elems, rid[keep]
+
+def refine_mesh(nodes, elems, max_area, geom=None, region_ids=None):
+    """Refine an existing triangulation with a per-element area bound (<=0 leaves an element
+    alone unless quality requires it). Mesh boundaries and interfaces between region_ids are
+    kept as constraints; new elements get region indices from `geom`. Needs `triangle`.
+    Returns nodes, elems and region indices (None without geom)."""
+    tr=_triangle()
+    if tr is None: raise RuntimeError('Mesh refinement needs the triangle package')
+    from geofea.core.topology import MeshTopology
+    T=MeshTopology(nodes, elems); ee=T.edge_elems; seg=ee[:,1]<0
+    if region_ids is not None:
+        rid=np.asarray(region_ids); seg|=rid[ee[:,0]]!=rid[np.maximum(ee[:,1],0)]
+    R=tr.triangulate({'vertices':np.asarray(nodes, float), 'triangles':np.asarray(elems), 'segments':T.edges[seg],
+                      'triangle_max_area':np.asarray(max_area, float)}, 'rpqa')
+    nodes,elems=R['vertices'], R['triangles']
+    return nodes, elems, None if geom is None else region_of(nodes[elems].mean(axis=1), geom)
@@ -0,0 +1,50 @@
+
+"""Element-block parallelism for the assembly and post-processing kernels.
+
+Kernels split the element range into blocks of BLOCK elements and run them on a shared thread
+pool per worker count (the NumPy work inside a block releases the GIL). Block boundaries never depend on the
+worker count and every block writes its own slice of preallocated outputs, so results are
+bit-for-bit identical for any number of workers.
+
+The worker count comes from set_workers(), else the GEOFEA_WORKERS environment variable, else
+the CPU count; kernels also take an explicit `workers` argument.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK = 32768
+_lock = threading.Lock()
+_workers = None
+_pools = {}   # one pool per worker count, never shut down: other threads may be submitting to it
+
+def default_workers():
+    env=os.environ.get('GEOFEA_WORKERS')
+    return max(1, int(env)) if env else (os.cpu_count() or 1)
+
+def set_workers(n=None):
+    """Set the worker count used when kernels are not given one (None restores the default)."""
+    global _workers
+    if n is not None and n<1: raise ValueError('workers must be >= 1')
+    _workers=n
+
+def get_workers():
+    return _workers or default_workers()
+
+def _executor(n):
+    with _lock:
+        if n not in _pools: _pools[n]=ThreadPoolExecutor(max_workers=n, thread_name_prefix=f'geofea{n}')
+        return _pools[n]
+
+def pmap(fn, items, workers=None):
+    """[fn(x) for x in items], evaluated on the pool; results keep the order of items."""
+    items=list(items); n=workers or get_workers()
+    if n<=1 or len(items)<=1: return [fn(x) for x in items]
+    return list(_executor(n).map(fn, items))
+
+def blocks(m, block=BLOCK):
+    return [slice(i, min(i+block, m)) for i in range(0, m, block)]
+
+def map_blocks(fn, m, workers=None):
+    """fn(slice) for consecutive element blocks covering range(m), in block order."""
+    return pmap(fn, blocks(m), workers)
@@ -0,0 +1,155 @@
+"""Incremental–iterative elastoplastic solve and shear-strength-reduction factor of safety.
+
+The load is applied in increments of the load factor λ (body forces and surface loads together);
+each increment is brought to equilibrium by modified Newton iterations on the elastic stiffness of a
+SolveSession. The factorization is therefore reused by every iteration, every increment and
+every strength-reduction trial, so an iteration costs one back-substitution, strain and internal
+force products over all Gauss points, and one vectorised return mapping per plastic material
+(MohrCoulomb.return_map). Anderson mixing of the last few corrections makes up for much of the
+convergence lost to the stiff iteration matrix. Increments that do not converge are halved; the
+load factor reached when the increment becomes too small is the collapse load factor.
+Elements of elastic materials stay elastic.
+"""
+import time
+import numpy as np
+from geofea.core.fem import element_dofs, t6_shape, T6_GAUSS
+from geofea.core.materials.mohr_coulomb import plane_strain_D4
+from geofea.core.post import element_strains, stress_field
+from geofea.core.profiling import Profile, no_progress
+from geofea.core.solver import SolveInfo
+
+KIP_PER_IN3_PER_PCF = 1/(1000*1728)
+
+def gauss_points(BA):
+    """B (m,g,3,n) and weights (m,g) for 3- or 6-node elements (a CST is a one-point element)."""
+    B,A=BA
+    return (B[:,None], A[:,None]) if B.ndim==3 else (B, A)
+
+def body_forces(nodes, elems, BA, materials, mat_ids, t_in):
+    """Consistent nodal loads of the materials' self weight (`unit_weight` in pcf, acting in -y)."""
+    elems=np.asarray(elems); _,W=gauss_points(BA); mat_ids=np.asarray(mat_ids)
+    g=np.array([getattr(m, 'unit_weight', 0.0) for m in materials])[mat_ids]*KIP_PER_IN3_PER_PCF
+    N=np.full((1,3), 1/3) if elems.shape[1]==3 else t6_shape(T6_GAUSS[0])[0]
+    fe=-t_in*g[:,None]*(W@N); F=np.zeros(2*len(nodes))
+    np.add.at(F, 2*elems+1, fe)
+    return F
+
+class _Model:
+    """Gauss-point kernels of one mesh: strains, stress updates and internal forces."""
+    def __init__(self, session, materials, mat_ids):
+        self.elems=np.asarray(session.elems); self.B,self.W=gauss_points(session.BA); self.t=session.t
+        self.dofs=element_dofs(self.elems); self.ndof=session.ndof
+        self.ids=np.zeros(len(self.elems), dtype=int) if mat_ids is None else np.asarray(mat_ids)
+        self.materials=materials; self.D4=[plane_strain_D4(m.E, m.nu) for m in materials]
+        self.sel=[np.flatnonzero(self.ids==k) for k in range(len(materials))]
+
+    def strain(self, u):
+        return np.einsum('egij,ej->egi', self.B, u[self.dofs])
+
+    def update(self, sig0, deps):
+        """Stresses after the strain increment and the mask of yielded points."""
+        sig=np.empty_like(sig0); yl=np.zeros(sig0.shape[:2], dtype=bool)
+        for k,M in enumerate(self.materials):
+            e=self.sel[k]
+            if not len(e): continue
+            s=sig0[e]+deps[e]@self.D4[k].T
+            if getattr(M, 'plastic', False):
+                s,y=M.return_map(s.reshape(-1,4)); s=s.reshape(len(e),-1,4); yl[e]=y.reshape(len(e),-1)
+            sig[e]=s
+        return sig, yl
+
+    def internal(self, sig):
+        fe=self.t*np.einsum('eg,egij,egi->ej', self.W, self.B, sig[...,:3])
+        return np.bincount(self.dofs.ravel(), weights=fe.ravel(), minlength=self.ndof)
+
+def solve_plastic(session, F, materials, mat_ids=None, steps=10, tol=1e-4, max_iter=150, min_step=None, memory=5,
+                  report=None, profile=None, _model=None):
+    """Elastoplastic solve of load vector F (including any body forces) on `session`'s mesh,
+    supports and elastic factorization. `materials` are the elements' material objects, indexed
+    by mat_ids; MohrCoulomb (plastic) ones yield. F is applied in `steps` equal increments of the
+    load factor, each iterated to a relative residual ‖r‖/‖λF‖ below `tol`; an increment failing
+    in max_iter iterations is halved, down to min_step (default 1/(16·steps)). `memory` corrections
+    are kept for Anderson mixing. Use 6-node elements for collapse loads: 3-node triangles lock
+    under (nearly) isochoric plastic flow and overestimate them.
+
+    Returns {'u','info','stress' (a StressField, with 'yielded' as the yielded fraction of each
+    element's points),'sigma' (Gauss-point stresses (m,g,4)),'yielded' (m,g),'load_factor',
+    'converged','history' (one dict per increment),'profile'}."""
+    report=report or no_progress; P=profile if profile is not None else Profile('plastic')
+    t0=time.perf_counter()-session.take_setup_time()   # a fresh session's factorization counts towards this solve
+    M=_model or _Model(session, materials, mat_ids); F=np.asarray(F, dtype=float)
+    fixed=session.fixed; restrained=np.fromiter(fixed.keys(), dtype=int, count=len(fixed))
+    zero={k: 0.0 for k in fixed}; min_step=min_step or 1/(16*steps)
+    u=np.zeros(M.ndof); sig=np.zeros(M.B.shape[:2]+(4,)); yl=np.zeros(M.B.shape[:2], dtype=bool)
+    lam=0.0; dlam=1.0/steps; history=[]; total=0; res=0.0
+    with P.stage('load steps'):
+        while lam<1.0-1e-12:
+            target=min(lam+dlam, 1.0); step_fixed={k: (target-lam)*v for k,v in fixed.items()}
+            Fs=target*F; scale=max(np.linalg.norm(np.delete(Fs, restrained)), 1e-30)
+            du=np.zeros(M.ndof); dX=[]; dG=[]; last=None; ok=False
+            for it in range(1, max_iter+1):
+                s,y=M.update(sig, M.strain(du)); r=Fs-M.internal(s); r[restrained]=0.0
+                res=float(np.linalg.norm(r))/scale
+                if not np.isfinite(res): break
+                if res<tol and it>1: ok=True; break
+                d,_=session.solve(r, fixed=step_fixed if it==1 else zero)
+                if it==1: du+=d; continue
+                if last is not None and memory:   # Anderson mixing over the last `memory` corrections
+                    dX.append(du-last[0]); dG.append(d-last[1]); dX=dX[-memory:]; dG=dG[-memory:]
+                last=(du.copy(), d)
+                if dX:
+                    X=np.column_stack(dX); G=np.column_stack(dG); g=np.linalg.lstsq(G, d, rcond=None)[0]
+                    du=du+d-(X+G)@g
+                else: du=du+d
+            total+=it
+            if ok:
+                u+=du; sig=s; yl=y; lam=target
+                history.append({'load_factor': lam, 'iterations': it, 'residual': res, 'yielded': float(yl.mean())})
+                report(f'Load factor {lam:.3f} ({it} iterations)', int(5+90*lam))
+            elif dlam/2>=min_step*(1-1e-9): dlam/=2
+            else: break
+    converged=lam>=1.0-1e-12
+    with P.stage('stresses'):
+        wn=M.W/M.W.sum(axis=1, keepdims=True); mean=np.einsum('eg,egk->ek', wn, sig)
+        B,A=session.BA; field=stress_field(session.nodes, M.elems, element_strains(M.elems, u, B, A), mean[:,:3], mean[:,3], session.topo)
+        field.yielded=(wn*yl).sum(axis=1)
+    info=SolveInfo('Mohr–Coulomb, modified Newton', M.ndof, total, res, time.perf_counter()-t0, nfree=len(session.free))
+    info.reactions=np.zeros(M.ndof); info.reactions[restrained]=(M.internal(sig)-lam*F)[restrained]
+    P.count(load_factor=lam, increments=len(history), iterations=total, yielded_points=int(yl.sum()))
+    return {'u':u, 'info':info, 'stress':field, 'sigma':sig, 'yielded':yl, 'load_factor':lam,
+            'converged':converged, 'history':history, 'profile':P}
+
+def factor_of_safety(session, F, materials, mat_ids=None, tol=0.01, steps=5, max_iter=150, report=None, profile=None):
+    """Shear-strength-reduction factor of safety: the largest factor SRF by which c, tanφ (and the
+    tensile strength) of every plastic material can be divided with the full load F still in
+    equilibrium. Bracketed from SRF = 1, then bisected to a relative width `tol`; a trial fails
+    when its load increments have been halved twice without converging. Every trial reuses
+    `session`'s factorization.
+
+    Returns {'fos','bracket' (stable, failed),'trials' (one dict per SRF tried),'result' (the
+    solve_plastic result at the factor of safety),'profile'}."""
+    report=report or no_progress; P=profile if profile is not None else Profile('strength reduction')
+    if not any(getattr(m, 'plastic', False) for m in materials): raise ValueError('No plastic material to reduce')
+    M=_Model(session, materials, mat_ids); trials=[]; best=None
+    def stable(srf):
+        nonlocal best
+        mats=[m.reduced(srf) if getattr(m, 'plastic', False) else m for m in materials]; M.materials=mats
+        with P.stage(f'SRF {srf:.3f}'):
+            r=solve_plastic(session, F, mats, mat_ids, steps=steps, max_iter=max_iter, min_step=1/(4*steps), _model=M,
+                            profile=Profile('trial'))
+        trials.append({'srf': srf, 'converged': r['converged'], 'load_factor': r['load_factor'],
+                       'iterations': r['info'].iterations})
+        report(f'SRF {srf:.3f}: {"stable" if r["converged"] else "failed"}', min(95, 5+5*len(trials)))
+        if r['converged'] and (best is None or srf>=best[0]): best=(srf, r)
+        return r['converged']
+    lo,hi=None,None; f=1.0
+    while lo is None or hi is None:
+        if f>64 or f<1/16: raise RuntimeError(f'Factor of safety outside 1/16…64 (last SRF tried: {f:g})')
+        if stable(f): lo=f; f*=2.0
+        else: hi=f; f/=2.0
+    while (hi-lo)>tol*lo:
+        mid=0.5*(lo+hi)
+        if stable(mid): lo=mid
+        else: hi=mid
+    P.count(fos=lo, trials=len(trials), iterations=sum(t['iterations'] for t in trials))
+    return {'fos':lo, 'bracket':(lo,hi), 'trials':trials, 'result':best[1], 'profile':P}
@@ -0,0 +1,76 @@
+
+from dataclasses import dataclass, field
+import numpy as np
+from geofea.core.fem import element_B_batch, element_dofs
+from geofea.core.topology import MeshTopology
+from geofea.core.parallel import map_blocks
+
+@dataclass(repr=False)
+class StressField:
+    """Per-element results plus area-weighted nodal averages. Constant-strain triangles give exact
+    element values; 6-node triangles give the mean over their Gauss points.
+
+    strain/stress columns are xx, yy, xy (engineering shear strain); sz is the out-of-plane
+    stress (zero in plane stress). theta is the angle of the s1 direction from +x, in radians.
+    yielded is the yielded fraction of each element (elastoplastic solves only).
+    """
+    strain: np.ndarray
+    stress: np.ndarray
+    sz: np.ndarray
+    s1: np.ndarray
+    s3: np.ndarray
+    theta: np.ndarray
+    von_mises: np.ndarray
+    mean: np.ndarray
+    nodal_stress: np.ndarray
+    topo: MeshTopology = field(default=None, repr=False)
+    yielded: np.ndarray = field(default=None, repr=False)
+
+    def nodal(self, values):
+        """Area-weighted nodal average of any per-element array (m,) or (m,k)."""
+        return self.topo.nodal_average(values)
+
+def element_strains(elems, u, B, A=None):
+    """Element strains; for Gauss-point B (m,g,3,n) the weighted mean over the points (weights A)."""
+    ue=u[element_dofs(elems)]
+    if B.ndim==3: return np.einsum('eij,ej->ei', B, ue)
+    return np.einsum('eg,egij,ej->ei', A/A.sum(axis=1, keepdims=True), B, ue)
+
+def principal_stresses(sig):
+    """In-plane principal stresses s1>=s3 and the s1 direction for stress rows (sxx, syy, sxy)."""
+    sx,sy,txy=sig[:,0],sig[:,1],sig[:,2]
+    c=0.5*(sx+sy); r=np.hypot(0.5*(sx-sy), txy)
+    return c+r, c-r, 0.5*np.arctan2(2*txy, sx-sy)
+
+def stress_field(nodes, elems, strain, stress, sz, topo=None):
+    """StressField of element strains and stresses computed elsewhere (e.g. by an elastoplastic solve)."""
+    sx,sy,txy=stress.T; s1,s3,th=principal_stresses(stress)
+    F=StressField(strain, stress, sz, s1, s3, th, np.sqrt(0.5*((sx-sy)**2+(sy-sz)**2+(sz-sx)**2)+3*txy**2),
+                  (sx+sy+sz)/3.0, None, topo if topo is not None else MeshTopology(nodes, elems))
+    F.nodal_stress=F.nodal(np.column_stack([stress, sz]))
+    return F
+
+def recover_stresses(nodes, elems, u, mat, BA=None, topo=None, mat_ids=None, workers=None):
+    """Strains, stresses and invariants for every element; pass BA from assembly to skip recomputing B
+    and the mesh's MeshTopology to reuse it for nodal averaging. `mat` is one material, or a list
+    of materials indexed by per-element mat_ids. Element kernels run per element block on `workers`
+    threads (see geofea.core.parallel)."""
+    elems=np.asarray(elems); m=len(elems)
+    B,A=BA if BA is not None else element_B_batch(nodes, elems, workers)
+    mats=[mat] if mat_ids is None else list(mat); ids=np.zeros(m, dtype=int) if mat_ids is None else np.asarray(mat_ids)
+    D=[M.D().T for M in mats]
+    F=StressField(np.empty((m,3)), np.empty((m,3)), **{k: np.zeros(m) for k in ('sz','s1','s3','theta','von_mises','mean')},
+                  nodal_stress=None, topo=topo)
+    def block(s):
+        eps=element_strains(elems[s], u, B[s], A[s]); sig=np.empty_like(eps); sz=np.zeros(len(eps)); bid=ids[s]
+        for k in np.unique(bid):
+            sel=bid==k; sig[sel]=eps[sel]@D[k]
+            if not mats[k].plane_stress: sz[sel]=mats[k].nu*(sig[sel,0]+sig[sel,1])
+        sx,sy,txy=sig.T
+        F.strain[s]=eps; F.stress[s]=sig; F.sz[s]=sz
+        F.s1[s],F.s3[s],F.theta[s]=principal_stresses(sig)
+        F.von_mises[s]=np.sqrt(0.5*((sx-sy)**2+(sy-sz)**2+(sz-sx)**2)+3*txy**2); F.mean[s]=(sx+sy+sz)/3.0
+    map_blocks(block, m, workers)
+    if F.topo is None: F.topo=MeshTopology(nodes, elems)
+    F.nodal_stress=F.nodal(np.column_stack([F.stress, F.sz]))
+    return F
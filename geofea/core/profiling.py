@@ -0,0 +1,110 @@
+
+"""Run instrumentation: per-stage wall time, peak memory and problem-size counters.
+
+Every geofea.core.run call fills a Profile (also returned as result['profile']). Stages record
+wall time and the process peak RSS when they end, so the stage where the peak grew is visible.
+Profile(capture=True) additionally runs cProfile and tracemalloc between start() and stop()
+(in the calling thread) and keeps the top entries in the report. to_dict()/to_json() export it.
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB (None where unavailable)."""
+    if sys.platform=='win32':
+        import ctypes
+        from ctypes import wintypes
+        class PMC(ctypes.Structure):
+            _fields_=[('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD), ('PeakWorkingSetSize', ctypes.c_size_t),
+                      ('WorkingSetSize', ctypes.c_size_t), ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                      ('QuotaPagedPoolUsage', ctypes.c_size_t), ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                      ('QuotaNonPagedPoolUsage', ctypes.c_size_t), ('PagefileUsage', ctypes.c_size_t),
+                      ('PeakPagefileUsage', ctypes.c_size_t)]
+        c=PMC(); c.cb=ctypes.sizeof(PMC)
+        h=ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(h, ctypes.byref(c), c.cb): return None
+        return c.PeakWorkingSetSize/2**20
+    try:
+        import resource
+    except ImportError:
+        return None
+    r=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r/2**20 if sys.platform=='darwin' else r/1024   # bytes on macOS, KiB on Linux
+
+def no_progress(stage, percent):
+    """`report` callback that ignores progress; the default for every geofea.core.run call."""
+
+class Profile:
+    """Stages (name, seconds, peak RSS after it) and counters of one run."""
+    def __init__(self, name='run', capture=False, top=30):
+        self.name=name; self.capture=capture; self.top=top
+        self.stages=[]; self.counters={}; self.started=time.time()
+        self._prof=None; self._tracing=False; self.cprofile=None; self.tracemalloc=None
+
+    @contextmanager
+    def stage(self, name):
+        t0=time.perf_counter()
+        try: yield self
+        finally: self.add_stage(name, time.perf_counter()-t0)
+
+    def add_stage(self, name, seconds):
+        self.stages.append({'stage': name, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()})
+
+    def count(self, **counters):
+        self.counters.update(counters)
+
+    @property
+    def total_s(self): return sum(s['seconds'] for s in self.stages)
+
+    # -------- opt-in deep capture --------
+    def start(self):
+        if not self.capture or self._prof is not None: return self
+        if not tracemalloc.is_tracing(): tracemalloc.start(); self._tracing=True
+        tracemalloc.reset_peak(); self._prof=cProfile.Profile(); self._prof.enable()
+        return self
+
+    def stop(self):
+        if self._prof is None: return self
+        self._prof.disable(); st=pstats.Stats(self._prof)
+        rows=sorted(st.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:self.top]
+        self.cprofile=[{'function': f'{os.path.basename(f)}:{line}({fn})', 'ncalls': nc, 'tottime_s': tt, 'cumtime_s': ct}
+                       for (f,line,fn),(cc,nc,tt,ct,_) in rows]
+        _,peak=tracemalloc.get_traced_memory(); snap=tracemalloc.take_snapshot()
+        self.tracemalloc={'peak_mb': peak/2**20,
+                          'top': [{'where': str(s.traceback[0]), 'size_mb': s.size/2**20, 'count': s.count}
+                                  for s in snap.statistics('lineno')[:self.top]]}
+        if self._tracing: tracemalloc.stop(); self._tracing=False
+        self._prof=None
+        return self
+
+    def __enter__(self): return self.start()
+    def __exit__(self, *exc): self.stop()
+
+    # -------- reporting --------
+    def to_dict(self):
+        d={'name': self.name, 'started': self.started, 'total_s': self.total_s, 'peak_rss_mb': peak_rss_mb(),
+           'stages': self.stages, 'counters': self.counters}
+        if self.cprofile is not None: d['cprofile']=self.cprofile
+        if self.tracemalloc is not None: d['tracemalloc']=self.tracemalloc
+        return d
+
+    def to_json(self, path=None):
+        s=json.dumps(self.to_dict(), indent=2, default=str)
+        if path is not None:
+            with open(path, 'w') as f: f.write(s)
+        return s
+
+    def summary(self):
+        """Plain-text table of stages and counters."""
+        lines=[f"{'stage':<24}{'seconds':>10}{'peak MB':>10}"]
+        for s in self.stages:
+            mb=s['peak_rss_mb']; lines.append(f"{s['stage']:<24}{s['seconds']:>10.3f}{'-' if mb is None else f'{mb:.0f}':>10}")
+        lines.append(f"{'total':<24}{self.total_s:>10.3f}")
+        lines+=[f'{k:<24}{v:>10.4g}' if isinstance(v, float) else f'{k:<24}{v!s:>10}' for k,v in self.counters.items()]
+        return '\n'.join(lines)
@@ -0,0 +1,170 @@
+
+"""Project files (.gfp): model, loads and results in one binary container.
+
+Layout: 8-byte magic, little-endian uint64 header length, UTF-8 JSON header, then raw
+C-contiguous arrays, each starting on a 64-byte boundary. The header holds the geometry,
+materials, loads and settings plus {name: {dtype, shape, offset}} for every array (offsets count
+from the first aligned byte after the header), so a reader can memory-map the arrays in place
+instead of reading them.
+"""
+from __future__ import annotations
+import json
+import os
+import struct
+from dataclasses import MISSING, dataclass, field, fields, replace
+from typing import Dict, List, Optional
+import numpy as np
+from geofea.core.geometry import GeometryModel, PolyRegion
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.materials.mohr_coulomb import MohrCoulomb
+from geofea.core.post import StressField
+from geofea.core.renumber import node_graph
+from geofea.core.topology import MeshTopology
+
+MAGIC = b'GEOFEA\x00\x01'
+ALIGN = 64
+_PRELUDE = struct.Struct('<8sQ')
+
+def _aligned(n): return -(-n//ALIGN)*ALIGN
+
+def write_container(path, header, arrays):
+    """Write header (JSON-serializable dict) and named arrays; replaces `path` atomically."""
+    arrays={k: np.ascontiguousarray(v) for k,v in arrays.items() if v is not None}
+    table={}; off=0
+    for k,a in arrays.items():
+        table[k]={'dtype': a.dtype.str, 'shape': list(a.shape), 'offset': off}; off=_aligned(off+a.nbytes)
+    head=json.dumps(dict(header, arrays=table)).encode('utf-8'); base=_aligned(_PRELUDE.size+len(head))
+    tmp=f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_PRELUDE.pack(MAGIC, len(head))); f.write(head)
+        for k,a in arrays.items():
+            f.seek(base+table[k]['offset']); f.write(memoryview(a.reshape(-1)).cast('B'))
+        f.truncate(base+off)
+    os.replace(tmp, path)
+
+def read_container(path, mmap=True):
+    """(header, arrays) of a container. With mmap the arrays are read-only views into the file and
+    pages are only read when touched; otherwise they are loaded into memory."""
+    with open(path, 'rb') as f:
+        magic,n=_PRELUDE.unpack(f.read(_PRELUDE.size))
+        if magic!=MAGIC: raise ValueError(f'{path}: not a GeoFEA project file')
+        header=json.loads(f.read(n).decode('utf-8'))
+    table=header.pop('arrays'); base=_aligned(_PRELUDE.size+n); arrays={}
+    buf=np.memmap(path, dtype=np.uint8, mode='r') if mmap and table else None
+    for k,t in table.items():
+        dt=np.dtype(t['dtype']); shape=tuple(t['shape']); nbytes=dt.itemsize*int(np.prod(shape))
+        off=base+t['offset']
+        if buf is not None: arrays[k]=buf[off:off+nbytes].view(dt).reshape(shape)
+        else: arrays[k]=np.fromfile(path, dtype=dt, count=nbytes//dt.itemsize, offset=off).reshape(shape)
+    return header, arrays
+
+def is_mapped(a):
+    """True when `a` is (a view into) a memory-mapped file."""
+    while isinstance(a, np.ndarray):
+        if isinstance(a, np.memmap): return True
+        a=a.base
+    return False
+
+def in_memory(x, _memo=None):
+    """`x` (an array, mesh dict, MeshTopology or StressField) with every memory-mapped array copied
+    into memory, each array and topology once; other arrays are shared. A file can only be replaced
+    (on Windows) once nothing maps it any more, so drop the mapped originals before saving over the
+    file they came from."""
+    memo=_memo if _memo is not None else {}
+    if id(x) in memo: return memo[id(x)][1]
+    if isinstance(x, np.ndarray): y=np.array(x) if is_mapped(x) else x
+    elif isinstance(x, dict): return {k: in_memory(v, memo) for k,v in x.items()}
+    elif isinstance(x, MeshTopology):
+        y=MeshTopology.from_arrays(in_memory(x.nodes, memo), in_memory(x.elems, memo), in_memory(x.arrays(), memo))
+    elif isinstance(x, StressField):
+        y=replace(x, **{f.name: in_memory(getattr(x, f.name), memo) for f in fields(StressField)})
+    else: return x
+    memo[id(x)]=(x, y)   # holding x keeps its id from being reused
+    return y
+
+# -------- model <-> header --------
+def _geom_to_dict(geom):
+    return {'regions': [{'name': r.name, 'outer': [list(p) for p in r.outer], 'holes': [[list(p) for p in h] for h in r.holes],
+                         'material': r.material, 'max_area': r.max_area} for r in geom.regions],
+            'materials': {k: _material_to_dict(m) for k,m in geom.materials.items()}}
+
+def _material_to_dict(m):
+    d={'E': m.E, 'nu': m.nu, 'plane_stress': m.plane_stress}
+    if isinstance(m, MohrCoulomb):
+        d.update(model='mohr-coulomb', c=m.c, phi=m.phi, psi=m.psi, tension=m.tension, unit_weight=m.unit_weight)
+    return d
+
+def _material_from_dict(m):
+    if m.get('model')=='mohr-coulomb':
+        return MohrCoulomb(m['E'], m['nu'], m['c'], m['phi'], m.get('psi', 0.0), m.get('tension'), m.get('unit_weight', 0.0))
+    return LinearElastic(m['E'], m['nu'], m.get('plane_stress', False))
+
+def _geom_from_dict(d):
+    regions=[PolyRegion(r['name'], [tuple(p) for p in r['outer']], [[tuple(p) for p in h] for h in r['holes']],
+                        r['material'], r.get('max_area')) for r in d['regions']]
+    mats={k: _material_from_dict(m) for k,m in d['materials'].items()}
+    return GeometryModel(regions, mats)
+
+def _json_load(L):
+    return {k: ([list(p) for p in v] if k=='poly' else list(v) if k=='pt' else v) for k,v in L.items()}
+
+def _load_from_dict(L):
+    L=dict(L)
+    if 'poly' in L: L['poly']=[tuple(p) for p in L['poly']]
+    if 'pt' in L: L['pt']=tuple(L['pt'])
+    return L
+
+# -------- projects --------
+@dataclass
+class Project:
+    """Contents of a project file. `arrays` holds the raw (possibly memory-mapped) arrays; mesh()
+    and stress() wrap them in the objects the solver and renderer use, without copying."""
+    geom: GeometryModel
+    loads: List[dict] = field(default_factory=list)
+    settings: Dict = field(default_factory=dict)
+    arrays: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def mesh(self) -> Optional[dict]:
+        a=self.arrays
+        if 'nodes' not in a: return None
+        t={k[5:]: v for k,v in a.items() if k.startswith('topo_')}
+        topo=MeshTopology.from_arrays(a['nodes'], a['elems'], t) if t else MeshTopology(a['nodes'], a['elems'])
+        return {'nodes': a['nodes'], 'elems': a['elems'], 'region_ids': a.get('region_ids'), 'topo': topo}
+
+    def stress(self, topo=None) -> Optional[StressField]:
+        a=self.arrays
+        if 'stress_stress' not in a: return None
+        # optional fields (e.g. yielded, plastic solves only) are absent from files that never had them
+        return StressField(**{f.name: a['stress_'+f.name] if f.default is MISSING else a.get('stress_'+f.name)
+                              for f in fields(StressField) if f.name!='topo'}, topo=topo)
+
+    @property
+    def u(self): return self.arrays.get('u')
+
+    @property
+    def reactions(self): return self.arrays.get('reactions')
+
+def save_project(path, geom, loads=(), settings=None, mesh=None, mat_ids=None, u=None, stress=None, reactions=None):
+    """Write a project file. mesh is the {'nodes','elems','region_ids','topo'} dict used by the UI;
+    its topology and the node-block sparsity pattern of K (each entry a 2x2 DOF block) are stored
+    with it so reopening needs no recomputation."""
+    arrays={}
+    if mesh is not None:
+        nodes=np.asarray(mesh['nodes'], dtype=float); elems=np.asarray(mesh['elems'])
+        G=node_graph(elems, len(nodes))
+        arrays.update(nodes=nodes, elems=elems, region_ids=mesh.get('region_ids'), mat_ids=mat_ids,
+                      K_indptr=G.indptr, K_indices=G.indices)
+        if mesh.get('topo') is not None: arrays.update({'topo_'+k: v for k,v in mesh['topo'].arrays().items()})
+    arrays.update(u=u, reactions=reactions)
+    if stress is not None:
+        arrays.update({'stress_'+f.name: getattr(stress, f.name) for f in fields(StressField) if f.name!='topo'})
+    header={'format': 'geofea-project', 'version': 1, 'model': _geom_to_dict(geom),
+            'loads': [_json_load(L) for L in loads], 'settings': dict(settings or {})}
+    write_container(path, header, arrays)
+
+def load_project(path, mmap=True) -> Project:
+    """Read a project file; with mmap (default) arrays stay on disk until accessed."""
+    header,arrays=read_container(path, mmap=mmap)
+    if header.get('version', 0)>1: raise ValueError(f'{path}: project format version {header["version"]} is newer than supported')
+    return Project(_geom_from_dict(header['model']), [_load_from_dict(L) for L in header.get('loads', [])],
+                   header.get('settings', {}), arrays)
@@ -0,0 +1,55 @@
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+def node_graph(elems, n):
+    """Symmetric node adjacency (CSR, with diagonal) of a triangle mesh."""
+    e=np.asarray(elems, dtype=int); k=e.shape[1]
+    r=np.repeat(e,k,axis=1).ravel(); c=np.tile(e,(1,k)).ravel()
+    G=sp.coo_matrix((np.ones(len(r), dtype=np.int8),(r,c)), shape=(n,n)).tocsr(); G.data[:]=1
+    return G
+
+def bandwidth_profile(elems, n):
+    """Node-graph half-bandwidth max|i-j| and profile Σ_i (i - min j) over connected pairs.
+    Multiply by 2 for the DOF-level figures of K."""
+    G=node_graph(elems, n).tocoo(); d=G.row-G.col
+    first=np.full(n, np.arange(n)); np.minimum.at(first, G.row, G.col)
+    return int(np.abs(d).max()) if len(d) else 0, int(np.sum(np.arange(n)-first))
+
+class Renumbering:
+    """Node permutation: perm[new]=old, inv[old]=new. Maps meshes, loads and fixities into the
+    new numbering and results back to the original one."""
+    def __init__(self, perm, elems=None):
+        self.perm=np.asarray(perm, dtype=int); self.inv=np.empty_like(self.perm); self.inv[self.perm]=np.arange(len(self.perm))
+        self.before=self.after=None
+        if elems is not None:
+            n=len(self.perm); self.before=bandwidth_profile(elems, n); self.after=bandwidth_profile(self.elems(elems), n)
+
+    def nodes(self, nodes): return np.asarray(nodes)[self.perm]
+    def elems(self, elems): return self.inv[np.asarray(elems, dtype=int)]
+    def dofs(self, dofs):
+        d=np.asarray(dofs, dtype=int); return 2*self.inv[d//2]+d%2
+    def fixed(self, fixed):
+        d=np.fromiter(fixed.keys(), dtype=int, count=len(fixed))
+        return dict(zip(self.dofs(d).tolist(), fixed.values()))
+
+    def to_new(self, v):
+        """Nodal DOF vector (2n,) or batch (2n,m) from original to new numbering."""
+        v=np.asarray(v); return v.reshape((len(self.perm),2)+v.shape[1:])[self.perm].reshape(v.shape)
+
+    def to_old(self, v):
+        v=np.asarray(v); return v.reshape((len(self.perm),2)+v.shape[1:])[self.inv].reshape(v.shape)
+
+    def report(self):
+        (b0,p0),(b1,p1)=self.before, self.after
+        return {'bandwidth_before':b0, 'bandwidth_after':b1, 'profile_before':p0, 'profile_after':p1}
+
+def rcm_renumbering(elems, n):
+    """Reverse Cuthill–McKee ordering of the mesh nodes, with bandwidth/profile before and after."""
+    return Renumbering(reverse_cuthill_mckee(node_graph(elems, n), symmetric_mode=True), elems)
+
+def reorder_mesh(nodes, elems):
+    """RCM-renumbered copies of nodes/elems plus the Renumbering that maps back."""
+    R=rcm_renumbering(elems, len(nodes))
+    return R.nodes(nodes), R.elems(elems), R
@@ -0,0 +1,130 @@
+
+"""Headless analysis pipeline: mesh a GeometryModel, map loads, fix supports, solve, recover stresses.
+
+Used by the GUI (on a worker thread) and by the batch runner (geofea.batch). `report(stage,
+percent)` callbacks are optional; the GUI passes one that also implements cancellation. Stage
+timings and sizes go to a geofea.core.profiling.Profile, returned as result['profile']. Pass the
+same geofea.core.incremental.IncrementalMesher as `cache` to successive runs to remesh and
+reassemble only the regions that changed. Models with Mohr–Coulomb materials are solved
+incrementally (geofea.core.plastic); factor_of_safety runs strength reduction on them.
+"""
+import numpy as np
+from geofea.core.loads import edges_near_polyline, assemble_line_traction, assemble_point_load
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.mesher_triangle import mesh_geometry
+from geofea.core.plastic import body_forces, solve_plastic, factor_of_safety as ssr
+from geofea.core.profiling import Profile, no_progress
+from geofea.core.solver import SolveSession
+from geofea.core.topology import MeshTopology
+
+def mesh_model(geom, max_area=None, quality=30, report=None, profile=None, cache=None, order=1):
+    """{'nodes','elems','region_ids','topo','profile'} for the whole model; with an
+    IncrementalMesher `cache` also 'parts', and only changed regions are remeshed. order=2
+    gives 6-node triangles (always meshed in full; the cache holds 3-node meshes only)."""
+    report=report or no_progress; P=profile if profile is not None else Profile('mesh')
+    report('Meshing', 5)
+    with P.stage('mesh'):
+        if cache is None or order!=1:
+            nodes, elems, region_ids = mesh_geometry(geom, max_area=max_area, quality=quality, order=order); parts=None
+        else:
+            m=cache.mesh(geom, max_area); nodes, elems, region_ids, parts = m['nodes'], m['elems'], m['region_ids'], m['parts']
+    report('Building topology', 60)
+    with P.stage('topology'): topo=MeshTopology(nodes, elems)
+    P.count(nodes=len(nodes), elements=len(elems), boundary_edges=len(topo.boundary))
+    mesh={'nodes':nodes, 'elems':elems, 'region_ids':region_ids, 'topo':topo, 'profile':P}
+    if parts is not None:
+        mesh['parts']=parts; P.count(regions_meshed=sum(not p['reused'] for p in parts), regions_reused=sum(p['reused'] for p in parts))
+    return mesh
+
+def load_vector(mesh, loads, scale=1.0, tol_in=3.0):
+    """Global force vector of line loads ({'type':'line','poly','tx','ty'}, kip/ft) and point loads
+    ({'type':'point','pt','Fx','Fy'}, kip), all multiplied by `scale`."""
+    nodes=mesh['nodes']; I=mesh['topo'].index; edges=I.edges; F=np.zeros(2*len(nodes))
+    for L in loads:
+        if L['type']=='line':
+            idx=edges_near_polyline(nodes, edges, L['poly'], tol_in=tol_in, index=I)
+            F+=assemble_line_traction(nodes, edges, idx, scale*L['tx'], scale*L['ty'])
+        else:
+            Fp,_=assemble_point_load(nodes, L['pt'], scale*L['Fx'], scale*L['Fy'], index=I); F+=Fp
+    return F
+
+def default_fixity(nodes):
+    """Rollers on the model's bottom (uy=0) and left (ux=0) edges."""
+    fixed={}; x=nodes[:,0]; y=nodes[:,1]
+    for n in np.where(np.isclose(y,y.min()))[0]: fixed[2*n+1]=0.0
+    for n in np.where(np.isclose(x,x.min()))[0]: fixed[2*n]=0.0
+    return fixed
+
+def _prepare(geom, loads, t_in, mesh, session, max_area, load_scale, fixed, method, report, P, cache, order):
+    """Mesh, load vector, supports and a SolveSession matching them (reused when it still matches)."""
+    if mesh is None: mesh=mesh_model(geom, max_area, report=report, profile=P, cache=cache, order=order)
+    nodes=mesh['nodes']
+    report('Mapping loads', 30)
+    with P.stage('load mapping'): F=load_vector(mesh, loads, load_scale)
+    with P.stage('supports'):
+        if fixed is None: fixed=default_fixity(nodes)
+    mats=list(geom.materials.values()); ids=geom.material_ids(mesh['region_ids'])
+    args=(nodes, mesh['elems'], [m.E for m in mats], [m.nu for m in mats], t_in, fixed)
+    if session is None or not session.matches(*args, ids):
+        report('Assembling and factoring K', 45); K=BA=None
+        if cache is not None and mesh.get('parts') is not None:
+            with P.stage('assembly'): K,BA,reused=cache.stiffness(mesh, np.stack([LinearElastic(m.E, m.nu).D() for m in mats]), t_in, ids)
+            P.count(blocks_reused=reused, blocks_assembled=len(mesh['parts'])-reused)
+        session=SolveSession(*args, method=method, topo=mesh['topo'], mat_ids=ids, reorder=True, profile=P, K=K, BA=BA)
+        P.count(reused_factorization=False)
+    else:
+        P.count(**dict(session.profile.counters, reused_factorization=True))
+    return mesh, F, session, mats, ids
+
+def is_plastic(geom):
+    """True when any material of the model yields (e.g. MohrCoulomb)."""
+    return any(getattr(m, 'plastic', False) for m in geom.materials.values())
+
+def solve_model(geom, loads, t_in=1.0, mesh=None, session=None, max_area=None, load_scale=1.0,
+                fixed=None, method='auto', report=None, profile=None, cache=None, order=1, steps=10):
+    """Mesh (unless `mesh` is given), map loads, assemble and factor (unless `session` still matches
+    the mesh, materials, thickness and supports), solve and recover stresses.
+
+    Returns {'mesh','session','u','info','stress','profile'}; pass mesh/session back in to reuse
+    them. With an IncrementalMesher `cache`, meshing and assembly reuse the regions that did not
+    change. `order` (1 or 2: 3- or 6-node triangles) applies when the model is meshed here. A Profile(capture=True) passed as `profile` also records cProfile/tracemalloc data.
+
+    When a material yields (see is_plastic), the loads plus the materials' self weight are applied
+    in `steps` increments by geofea.core.plastic.solve_plastic, and its 'load_factor',
+    'converged' and 'history' are added to the result."""
+    report=report or no_progress; P=profile if profile is not None else Profile('solve')
+    P.start()
+    try:
+        mesh,F,session,mats,ids=_prepare(geom, loads, t_in, mesh, session, max_area, load_scale, fixed, method, report, P, cache, order)
+        if is_plastic(geom):
+            with P.stage('body forces'): F=F+body_forces(mesh['nodes'], mesh['elems'], session.BA, mats, ids, t_in)
+            r=solve_plastic(session, F, mats, ids, steps=steps, report=report, profile=P)
+            return {'mesh':mesh, 'session':session, 'u':r['u'], 'info':r['info'], 'stress':r['stress'], 'profile':P,
+                    'load_factor':r['load_factor'], 'converged':r['converged'], 'history':r['history']}
+        report('Solving', 75)
+        with P.stage('solve'): u,info=session.solve(F)
+        P.count(iterations=info.iterations, residual=info.residual)
+        report('Recovering stresses', 90)
+        with P.stage('stresses'): stress=session.stresses(u)
+    finally:
+        P.stop()
+    return {'mesh':mesh, 'session':session, 'u':u, 'info':info, 'stress':stress, 'profile':P}
+
+def factor_of_safety(geom, loads, t_in=1.0, mesh=None, session=None, max_area=None, load_scale=1.0,
+                     fixed=None, method='auto', report=None, profile=None, cache=None, order=1, steps=5, tol=0.01):
+    """Shear-strength-reduction factor of safety of the model under its loads and self weight
+    (geofea.core.plastic.factor_of_safety), with the mesh/session reuse of solve_model.
+
+    Returns the solve_model result at the factor of safety plus 'fos', 'bracket' and 'trials'."""
+    report=report or no_progress; P=profile if profile is not None else Profile('strength reduction')
+    if not is_plastic(geom): raise ValueError('Factor of safety needs at least one Mohr–Coulomb material')
+    P.start()
+    try:
+        mesh,F,session,mats,ids=_prepare(geom, loads, t_in, mesh, session, max_area, load_scale, fixed, method, report, P, cache, order)
+        with P.stage('body forces'): F=F+body_forces(mesh['nodes'], mesh['elems'], session.BA, mats, ids, t_in)
+        s=ssr(session, F, mats, ids, tol=tol, steps=steps, report=report, profile=P); r=s['result']
+        r['info'].time_s=P.total_s; r['info'].iterations=P.counters['iterations']
+    finally:
+        P.stop()
+    return {'mesh':mesh, 'session':session, 'u':r['u'], 'info':r['info'], 'stress':r['stress'], 'profile':P,
+            'fos':s['fos'], 'bracket':s['bracket'], 'trials':s['trials']}
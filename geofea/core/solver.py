@@ -1,16 +1,199 @@
 
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Optional
 import numpy as np
-from geofea.core.fem import assemble_K_linear
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from geofea.core.fem import assemble_K_linear, element_B_batch
 from geofea.core.materials.elastic import LinearElastic
+from geofea.core.post import recover_stresses
+from geofea.core.renumber import rcm_renumbering
+from geofea.core.profiling import Profile
 
-def _apply_dirichlet(K, F, fixed):
-    K=K.copy(); F=F.copy()
-    for dof,val in fixed.items():
-        K[dof,:]=0; K[:,dof]=0; K[dof,dof]=1; F[dof]=val
-    return K,F
-
-def solve_linear(nodes, elems, E_ksi, nu, t_in, F_ext, fixed):
-    D=LinearElastic(E_ksi,nu,False).D()
-    K=assemble_K_linear(nodes, elems, D, t_in)
-    Kc,Fc=_apply_dirichlet(K,F_ext,fixed)
-    return np.linalg.solve(Kc,Fc)
+# 'auto' switches from sparse LU to preconditioned CG above this many DOFs
+AUTO_DIRECT_MAX_DOF = 200_000
+
+@dataclass
+class SolveInfo:
+    method: str
+    ndof: int
+    iterations: int = 0
+    residual: float = 0.0
+    time_s: float = 0.0
+    reactions: Optional[np.ndarray] = field(default=None, repr=False)
+    nfree: Optional[int] = None   # unrestrained DOFs actually solved for (ndof when nothing is restrained)
+
+    def __post_init__(self):
+        if self.nfree is None: self.nfree=self.ndof
+
+def partition_dofs(ndof, fixed):
+    """Sorted free DOFs, sorted prescribed DOFs and their prescribed values."""
+    pres=np.fromiter(fixed.keys(), dtype=int, count=len(fixed))
+    vals=np.fromiter(fixed.values(), dtype=float, count=len(fixed))
+    o=np.argsort(pres); pres=pres[o]; vals=vals[o]
+    mask=np.ones(ndof, dtype=bool); mask[pres]=False
+    return np.flatnonzero(mask), pres, vals
+
+def jacobi_preconditioner(K):
+    d=1.0/K.diagonal()
+    return spla.LinearOperator(K.shape, matvec=lambda r: d*r, dtype=float)
+
+def ichol_preconditioner(K, drop_tol=1e-3, fill_factor=10):
+    """Incomplete Cholesky M = Pᵀ·L·diag(d)·Lᵀ·P, built from a symmetric-mode threshold ILU."""
+    ilu=spla.spilu(sp.csc_matrix(K), drop_tol=drop_tol, fill_factor=fill_factor, permc_spec='MMD_AT_PLUS_A',
+                   diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+    d=ilu.U.diagonal(); pr=ilu.perm_r; pc=ilu.perm_c
+    L=spla.splu(ilu.L.tocsc(), permc_spec='NATURAL', diag_pivot_thresh=0.0, options=dict(SymmetricMode=True))
+    def apply(r):
+        z=np.empty_like(r); z[pr]=r
+        return L.solve(L.solve(z)/d, trans='T')[pc]
+    return spla.LinearOperator(K.shape, matvec=apply, dtype=float)
+
+PRECONDITIONERS = {'jacobi': jacobi_preconditioner, 'ic': ichol_preconditioner, 'none': None}
+
+class SparseSolver:
+    """Factor (LU) or precondition (CG) K once, then solve for one or many right-hand sides."""
+    def __init__(self, K, method='auto', tol=1e-10, maxiter=None, precond='ic'):
+        n=K.shape[0]
+        if method=='auto': method='direct' if n<=AUTO_DIRECT_MAX_DOF else 'cg'
+        if method not in ('direct','cg'): raise ValueError(f'Unknown solver method {method!r}')
+        if method=='cg' and precond not in PRECONDITIONERS: raise ValueError(f'Unknown preconditioner {precond!r}')
+        self.K=sp.csr_matrix(K); self.method=method; self.tol=tol; self.maxiter=maxiter
+        t0=time.perf_counter()
+        if method=='direct':
+            self._lu=spla.splu(sp.csc_matrix(K))
+        else:
+            M=PRECONDITIONERS[precond]; self._M=M(self.K) if M is not None else None
+        self.setup_time=time.perf_counter()-t0
+
+    def _cg(self, b):
+        it=0
+        def count(_):
+            nonlocal it; it+=1
+        x,flag=spla.cg(self.K, b, rtol=self.tol, atol=0.0, maxiter=self.maxiter, M=self._M, callback=count)
+        if flag>0: raise RuntimeError(f'CG did not converge in {it} iterations')
+        if flag<0: raise RuntimeError('CG breakdown (matrix not SPD?)')
+        return x, it
+
+    def solve(self, F):
+        """F is (n,) or (n,m); returns u of the same shape and a SolveInfo (time excludes setup)."""
+        F=np.asarray(F, dtype=float); t0=time.perf_counter(); it=0
+        if self.method=='direct':
+            u=self._lu.solve(F)
+        elif F.ndim==1:
+            u,it=self._cg(F)
+        else:
+            u=np.empty_like(F)
+            for j in range(F.shape[1]):
+                u[:,j],k=self._cg(F[:,j]); it+=k
+        dt=time.perf_counter()-t0
+        nF=np.linalg.norm(F, axis=0); nF=np.where(nF>0, nF, 1.0)
+        res=float(np.max(np.linalg.norm(self.K@u-F, axis=0)/nF))
+        return u, SolveInfo(self.method, self.K.shape[0], it, res, dt)
+
+def solve_system(K, F, method='auto', tol=1e-10, maxiter=None, precond='ic'):
+    """Solve K u = F with a sparse backend: 'direct' (LU), 'cg' (preconditioned CG) or 'auto' by size."""
+    S=SparseSolver(K, method=method, tol=tol, maxiter=maxiter, precond=precond)
+    u,info=S.solve(F); info.time_s+=S.setup_time
+    return u, info
+
+def solve_constrained(K, F, fixed, method='auto', **solver_opts):
+    """Eliminate prescribed DOFs, solve the free-DOF system and recover reactions at the fixed DOFs."""
+    n=K.shape[0]; free,pres,vals=partition_dofs(n, fixed)
+    K=sp.csr_matrix(K); F=np.asarray(F, dtype=float); Kf=K[free]
+    u=np.zeros(n); u[pres]=vals
+    u[free],info=solve_system(Kf[:,free], F[free]-Kf[:,pres]@vals, method=method, **solver_opts)
+    info.reactions=np.zeros(n); info.reactions[pres]=K[pres]@u-F[pres]
+    return u, info
+
+def _materials(E_ksi, nu):
+    E=np.atleast_1d(np.asarray(E_ksi, dtype=float)); v=np.broadcast_to(np.asarray(nu, dtype=float), E.shape)
+    return [LinearElastic(float(e), float(n), False) for e,n in zip(E,v)]
+
+def session_key(nodes, elems, E_ksi, nu, t_in, fixed, mat_ids=None):
+    """Identity of a mesh + material + restraint set (prescribed values excluded)."""
+    h=hashlib.blake2b(digest_size=16)
+    for a in (nodes, elems) if mat_ids is None else (nodes, elems, mat_ids):
+        a=np.ascontiguousarray(a); h.update(f'{a.dtype.str}{a.shape}'.encode()); h.update(a.tobytes())
+    h.update(repr([(m.E, m.nu) for m in _materials(E_ksi, nu)]+[float(t_in)]).encode())
+    h.update(np.sort(np.fromiter(fixed, dtype=int, count=len(fixed))).tobytes())
+    return h.hexdigest()
+
+class SolveSession:
+    """Assembled, factored system for one mesh/material/restraint set; many load cases reuse it.
+
+    `fixed` gives the restrained DOFs and their default prescribed values; `solve` takes a
+    (2n,) load vector or a (2n,m) batch and only back-substitutes. E_ksi/nu may be sequences,
+    one entry per material, with mat_ids giving each element's material. reorder=True assembles
+    and factors in reverse Cuthill–McKee node order (see self.renumbering.report()); loads,
+    fixities and results stay in the caller's numbering. `workers` threads run the element-block
+    kernels (default: geofea.core.parallel.get_workers()). Setup stages and sizes are recorded in
+    `profile` (a geofea.core.profiling.Profile, created if not given). A stiffness K and element
+    geometry BA assembled elsewhere (e.g. by geofea.core.incremental) may be passed in, in the
+    caller's numbering; they must belong to these nodes, elements and materials.
+    """
+    def __init__(self, nodes, elems, E_ksi, nu, t_in, fixed, method='auto', topo=None, mat_ids=None, reorder=False,
+                 workers=None, profile=None, K=None, BA=None, **solver_opts):
+        self.key=session_key(nodes, elems, E_ksi, nu, t_in, fixed, mat_ids)
+        self.nodes=nodes; self.elems=elems; self.t=t_in; self.topo=topo; self.workers=workers; self.fixed=dict(fixed)
+        self.materials=_materials(E_ksi, nu); self.mat_ids=None if mat_ids is None else np.asarray(mat_ids, dtype=int)
+        if len(self.materials)>1 and self.mat_ids is None: raise ValueError('mat_ids is required with several materials')
+        self.D=np.stack([m.D() for m in self.materials]) if self.mat_ids is not None else self.materials[0].D()
+        P=self.profile=profile if profile is not None else Profile('solve session')
+        if BA is None:
+            with P.stage('element B matrices'): BA=element_B_batch(nodes, elems, workers)
+        self.BA=BA
+        with P.stage('renumbering'):
+            R=self.renumbering=rcm_renumbering(elems, len(nodes)) if reorder else None
+            Kn,Ke=(nodes,elems) if R is None else (R.nodes(nodes),R.elems(elems))
+            if K is not None and R is not None:
+                d=R.dofs(np.arange(2*len(nodes))); p=np.empty_like(d); p[d]=np.arange(len(d)); K=sp.csr_matrix(K)[p][:,p]
+        if K is None:
+            with P.stage('assembly'): K=assemble_K_linear(Kn, Ke, self.D, t_in, BA=self.BA, mat_ids=self.mat_ids, workers=workers)
+        n=K.shape[0]
+        with P.stage('constraints'):
+            self.free,self.pres,self.vals=partition_dofs(n, fixed if R is None else R.fixed(fixed))
+            Kf=K[self.free]; self.Kfp=Kf[:,self.pres]; Kff=Kf[:,self.free]; self.Kp=K[self.pres]
+        with P.stage('factorization'): self.solver=SparseSolver(Kff, method=method, **solver_opts)
+        self.ndof=n; self._setup_time=self.solver.setup_time
+        P.count(nodes=len(nodes), elements=len(elems), dofs=n, free_dofs=len(self.free), nnz=K.nnz, method=self.solver.method)
+        if self.solver.method=='direct': P.count(factor_nnz=self.solver._lu.L.nnz+self.solver._lu.U.nnz)
+        if R is not None: P.count(**R.report())
+
+    def matches(self, nodes, elems, E_ksi, nu, t_in, fixed, mat_ids=None):
+        return self.key==session_key(nodes, elems, E_ksi, nu, t_in, fixed, mat_ids)
+
+    def take_setup_time(self):
+        """Factorization time the first time it is asked for, then 0: it is charged to one solve only."""
+        t=self._setup_time; self._setup_time=0.0
+        return t
+
+    def solve(self, F, fixed=None):
+        """Displacements and SolveInfo (with reactions) for F; `fixed` may override prescribed values.
+        The first solve's time_s includes the factorization."""
+        F=np.asarray(F, dtype=float); vals=self.vals; R=self.renumbering
+        if R is not None:
+            F=R.to_new(F); fixed=None if fixed is None else R.fixed(fixed)
+        if fixed is not None:
+            _,pres,vals=partition_dofs(self.ndof, fixed)
+            if not np.array_equal(pres, self.pres): raise ValueError('Restrained DOFs differ from this session')
+        up=vals if F.ndim==1 else np.repeat(vals[:,None], F.shape[1], axis=1)
+        u=np.zeros(F.shape); u[self.pres]=up
+        u[self.free],info=self.solver.solve(F[self.free]-self.Kfp@up); info.ndof=self.ndof; info.time_s+=self.take_setup_time()
+        info.reactions=np.zeros(F.shape); info.reactions[self.pres]=self.Kp@u-F[self.pres]
+        if R is not None: u=R.to_old(u); info.reactions=R.to_old(info.reactions)
+        return u, info
+
+    def stresses(self, u):
+        """Element/nodal stress field for a displacement vector, reusing the cached B matrices."""
+        mat=self.materials if self.mat_ids is not None else self.materials[0]
+        return recover_stresses(self.nodes, self.elems, u, mat, BA=self.BA, topo=self.topo, mat_ids=self.mat_ids, workers=self.workers)
+
+def solve_linear(nodes, elems, E_ksi, nu, t_in, F_ext, fixed, method='auto', full_output=False, mat_ids=None, **solver_opts):
+    """Linear elastic plane-strain solve; full_output=True also returns a SolveInfo (with reactions).
+    Pass per-material E_ksi/nu sequences and per-element mat_ids for layered models."""
+    S=SolveSession(nodes, elems, E_ksi, nu, t_in, fixed, method=method, mat_ids=mat_ids, **solver_opts)
+    u,info=S.solve(F_ext)
+    return (u,info) if full_output else u
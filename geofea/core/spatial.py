@@ -0,0 +1,35 @@
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+def segment_distances(P, a, b):
+    """Distances from points P (k,2) to segment a-b; same formula as loads.point_to_segment_distance."""
+    P=np.asarray(P, dtype=float); a=np.asarray(a, dtype=float); ab=np.asarray(b, dtype=float)-a
+    ap=P-a; ab2=ab.dot(ab)+1e-30; t=np.clip((ap[:,0]*ab[0]+ap[:,1]*ab[1])/ab2, 0, 1)
+    d=P-(a+t[:,None]*ab); return np.sqrt(d[:,0]*d[:,0]+d[:,1]*d[:,1])
+
+class SpatialIndex:
+    """k-d trees over mesh nodes and boundary-edge midpoints, built once per mesh."""
+    def __init__(self, nodes, edges=None):
+        self.nodes=np.asarray(nodes, dtype=float); self.node_tree=cKDTree(self.nodes)
+        self.edges=None if edges is None else np.asarray(edges, dtype=int)
+        if self.edges is not None:
+            self.mids=(self.nodes[self.edges[:,0]]+self.nodes[self.edges[:,1]])/2.0
+            self.mid_tree=cKDTree(self.mids) if len(self.mids) else None
+
+    def nearest_node(self, pt):
+        """Index of the closest node; ties resolve to the lowest index, like an argmin scan."""
+        p=np.asarray(pt, dtype=float); d,_=self.node_tree.query(p)
+        cand=np.array(sorted(self.node_tree.query_ball_point(p, d*(1+1e-9)+1e-12)), dtype=int)
+        dif=self.nodes[cand]-p; return int(cand[np.argmin(np.sum(dif*dif, axis=1))])
+
+    def edges_near_polyline(self, polyline, tol_in):
+        """Sorted indices of edges whose midpoint lies within tol_in of the polyline."""
+        if len(polyline)<2 or self.edges is None or self.mid_tree is None: return np.array([], dtype=int)
+        P=np.asarray(polyline, dtype=float); hit=np.zeros(len(self.mids), dtype=bool)
+        for a,b in zip(P[:-1], P[1:]):
+            r=0.5*float(np.linalg.norm(b-a))+tol_in
+            cand=np.asarray(self.mid_tree.query_ball_point((a+b)/2.0, r*(1+1e-9)+1e-12), dtype=int)
+            cand=cand[~hit[cand]]
+            if len(cand): hit[cand[segment_distances(self.mids[cand], a, b)<=tol_in]]=True
+        return np.flatnonzero(hit)
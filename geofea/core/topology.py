@@ -0,0 +1,81 @@
+
+import numpy as np
+from geofea.core.parallel import pmap
+
+_LOCAL_EDGES = np.array([[0,1],[1,2],[2,0]])
+
+def edge_table(elems):
+    """Unique sorted edges (ne,2), element->edge ids (m,3) and the number of elements per edge."""
+    e=np.asarray(elems, dtype=int)[:,:3]; s=np.sort(e[:,_LOCAL_EDGES].reshape(-1,2), axis=1)
+    edges,inv,cnt=np.unique(s, axis=0, return_inverse=True, return_counts=True)
+    return edges, inv.reshape(-1,3), cnt
+
+class MeshTopology:
+    """Connectivity of a triangle mesh, derived once and shared by loads, solver and renderer.
+
+    edges          unique edges, node ids sorted within each row
+    elem_edges     (m,3) edge ids of each element
+    edge_elems     (ne,2) adjacent elements of each edge, -1 where there is none
+    boundary       ids of edges used by one element; boundary_edges holds their node pairs
+                   (plus the mid-side node as a third column in 6-node meshes)
+    edge_mid       mid-side node of each edge in 6-node meshes, else None
+    node_elems_ptr / node_elems   node->element incidence in CSR form
+    areas          element areas
+    """
+    def __init__(self, nodes, elems):
+        self.nodes=np.asarray(nodes, dtype=float); self.elems=np.asarray(elems, dtype=int)
+        m=len(self.elems); n=len(self.nodes)
+        self.edges,self.elem_edges,cnt=edge_table(self.elems)
+        owner=np.repeat(np.arange(m),3); flat=self.elem_edges.ravel()
+        order=np.argsort(flat, kind='stable'); start=np.searchsorted(flat[order], np.arange(len(self.edges)))
+        self.edge_elems=np.full((len(self.edges),2), -1, dtype=int)
+        self.edge_elems[:,0]=owner[order[start]]; two=cnt==2
+        self.edge_elems[two,1]=owner[order[start[two]+1]]
+        self.boundary=np.flatnonzero(cnt==1); self._set_edge_mid()
+        corners=self.elems[:,:3].ravel()
+        self.node_elems_ptr=np.concatenate([[0], np.cumsum(np.bincount(corners, minlength=n))])
+        self.node_elems=np.argsort(corners, kind='stable')//3
+        xy=self.nodes[self.elems[:,:3]]; d1=xy[:,1]-xy[:,0]; d2=xy[:,2]-xy[:,0]
+        self.areas=0.5*np.abs(d1[:,0]*d2[:,1]-d2[:,0]*d1[:,1])
+        self._w=np.bincount(corners, weights=np.repeat(self.areas,3), minlength=n); self._w[self._w==0]=1.0
+        self._index=None
+
+    _STORED = ('edges','elem_edges','edge_elems','boundary','node_elems_ptr','node_elems','areas','_w')
+
+    def arrays(self):
+        """Derived arrays by name, for storing next to the mesh (see from_arrays)."""
+        return {k.lstrip('_'): getattr(self, k) for k in self._STORED}
+
+    @classmethod
+    def from_arrays(cls, nodes, elems, arrays):
+        """Rebuild from arrays() output without recomputing anything; arrays may be memory-mapped."""
+        T=cls.__new__(cls); T.nodes=nodes; T.elems=elems; T._index=None
+        for k in cls._STORED: setattr(T, k, arrays[k.lstrip('_')])
+        T._set_edge_mid()
+        return T
+
+    def _set_edge_mid(self):
+        self.edge_mid=None; self.boundary_edges=self.edges[self.boundary]
+        if self.elems.shape[1]==6:
+            self.edge_mid=np.empty(len(self.edges), dtype=int); self.edge_mid[self.elem_edges]=self.elems[:,3:6]
+            self.boundary_edges=np.column_stack([self.boundary_edges, self.edge_mid[self.boundary]])
+
+    def node_elements(self, i):
+        return self.node_elems[self.node_elems_ptr[i]:self.node_elems_ptr[i+1]]
+
+    def nodal_average(self, values):
+        """Area-weighted average of per-element values (m,) or (m,k) at the corner nodes; mid-side
+        nodes of 6-node meshes take the mean of their edge's corners."""
+        v=np.asarray(values, dtype=float); flat=v.reshape(len(self.areas),-1); c=self.elems[:,:3].ravel()
+        out=np.column_stack(pmap(lambda col: np.bincount(c, weights=np.repeat(self.areas*col,3), minlength=len(self._w)), flat.T))
+        out/=self._w[:,None]
+        if self.edge_mid is not None: out[self.edge_mid]=0.5*(out[self.edges[:,0]]+out[self.edges[:,1]])
+        return out.reshape((len(self._w),)+v.shape[1:])
+
+    @property
+    def index(self):
+        """SpatialIndex over nodes and boundary edges, built on first use."""
+        if self._index is None:
+            from geofea.core.spatial import SpatialIndex
+            self._index=SpatialIndex(self.nodes, self.boundary_edges)
+        return self._index
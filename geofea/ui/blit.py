@@ -0,0 +1,35 @@
+
+from __future__ import annotations
+
+class BlitManager:
+    """Blitting for interactive overlays (rubber bands, HUD) on one FigureCanvas.
+
+    Registered artists are animated, so a full draw leaves them out; the draw caches that static
+    background (grid, geometry, mesh, results). update() then restores the cached pixels and
+    redraws only the overlays, independent of how much is on the axes."""
+    def __init__(self, canvas):
+        self.canvas=canvas; self.artists=[]; self._bg=None
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add(self, art):
+        art.set_animated(True); self.artists.append(art); return art
+
+    def remove(self, art):
+        if art is None: return
+        if art in self.artists: self.artists.remove(art)
+        try: art.remove()
+        except Exception: pass
+
+    def _on_draw(self, ev):
+        self._bg=self.canvas.copy_from_bbox(self.canvas.figure.bbox); self._draw_artists()
+
+    def _draw_artists(self):
+        fig=self.canvas.figure
+        for a in self.artists: fig.draw_artist(a)
+
+    def update(self):
+        """Repaint the overlays on top of the cached background (full draw if there is none yet)."""
+        if self._bg is None or not self.canvas.supports_blit:
+            self.canvas.draw_idle(); return
+        self.canvas.restore_region(self._bg); self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
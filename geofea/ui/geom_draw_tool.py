@@ -4,18 +4,30 @@ from PySide6 import QtCore
 import numpy as np
 from matplotlib.lines import Line2D
 from matplotlib.patches import Rectangle, Circle
+from matplotlib.collections import LineCollection
+from .blit import BlitManager
+from geofea.core.geometry import circle_points
 
 class SketchMode: SELECT=0; POLY=1; RECT=2; CIRCLE=3
 
 class GeometrySketcher(QtCore.QObject):
-    """RS2-style interactive sketcher with SNAP/GRID/ORTHO and HUD."""
+    """RS2-style interactive sketcher with SNAP/GRID/ORTHO and HUD.
+
+    Rubber band and HUD are blitted over the cached background; the grid is one LineCollection
+    rebuilt only when the view limits change."""
     polygonFinished = QtCore.Signal(list)
+    max_grid_lines = 200
 
-    def __init__(self, ax, snap=True, grid=12.0, show_grid=True, ortho=False):
+    def __init__(self, ax, snap=True, grid=12.0, show_grid=True, ortho=False, blit=None):
         super().__init__()
         self.ax=ax; self.snap=snap; self.grid=grid; self.show_grid=show_grid; self.ortho=ortho
         self.mode=SketchMode.SELECT
         self._pts=[]; self._rubber=None; self._press=None; self._hud=None
+        self.blit=blit or BlitManager(ax.figure.canvas)
+        self._grid=LineCollection([], colors=[(0.92,0.92,0.92)], lw=0.3, zorder=0)
+        ax.add_collection(self._grid, autolim=False)
+        ax.callbacks.connect('xlim_changed', self._update_grid)
+        ax.callbacks.connect('ylim_changed', self._update_grid)
 
         c=ax.figure.canvas
         c.setMouseTracking(True)
@@ -32,11 +44,10 @@ class GeometrySketcher(QtCore.QObject):
     def set_flags(self, snap=None, grid=None, ortho=None, show_grid=None):
         if snap is not None: self.snap=snap
         if ortho is not None: self.ortho=ortho
-        if show_grid is not None:
-            self.show_grid=show_grid
-            self.ax.clear()
-            if self.show_grid: self.draw_grid()
-            self.ax.figure.canvas.draw_idle()
+        if grid is not None: self.grid=grid
+        if show_grid is not None: self.show_grid=show_grid
+        if grid is not None or show_grid is not None:
+            self._update_grid(); self.ax.figure.canvas.draw_idle()
 
     def set_mode(self, mode):
         self.mode=mode; self._clear_temp()
@@ -45,11 +56,20 @@ class GeometrySketcher(QtCore.QObject):
 
     def draw_grid(self, xlim=(0, 480), ylim=(0, 300)):
         self.ax.set_xlim(*xlim); self.ax.set_ylim(*ylim); self.ax.set_aspect('equal','box')
+        self._update_grid()
+
+    def _update_grid(self, *_):
+        """Grid lines covering the current view; spacing is coarsened by whole multiples of the
+        snap grid so that at most max_grid_lines are drawn per direction."""
+        if self._grid not in self.ax.collections: self.ax.add_collection(self._grid, autolim=False)
+        self._grid.set_visible(self.show_grid)
         if not self.show_grid: return
-        xs=np.arange(xlim[0], xlim[1]+self.grid, self.grid)
-        ys=np.arange(ylim[0], ylim[1]+self.grid, self.grid)
-        for x in xs: self.ax.axvline(x, color=(0.92,0.92,0.92), lw=0.3, zorder=0)
-        for y in ys: self.ax.axhline(y, color=(0.92,0.92,0.92), lw=0.3, zorder=0)
+        (x0,x1),(y0,y1)=sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        g=self.grid*max(1, int(np.ceil(max(x1-x0, y1-y0)/self.grid/self.max_grid_lines)))
+        xs=np.arange(np.floor(x0/g), np.ceil(x1/g)+1)*g; ys=np.arange(np.floor(y0/g), np.ceil(y1/g)+1)*g
+        vert=np.stack([np.c_[xs, np.full_like(xs, y0)], np.c_[xs, np.full_like(xs, y1)]], axis=1)
+        horz=np.stack([np.c_[np.full_like(ys, x0), ys], np.c_[np.full_like(ys, x1), ys]], axis=1)
+        self._grid.set_segments(np.concatenate([vert, horz]))
 
     # ---------- events ----------
     def _snap_xy(self, x, y):
@@ -96,18 +116,18 @@ class GeometrySketcher(QtCore.QObject):
 
     # ---------- helpers ----------
     def _clear_temp(self):
-        for art in (self._rubber, self._hud):
-            if art is not None:
-                try: art.remove()
-                except Exception: pass
+        for art in (self._rubber, self._hud): self.blit.remove(art)
         self._rubber=None; self._hud=None; self._press=None
-        self.ax.figure.canvas.draw_idle()
+        self.blit.update()
+
+    def _set_rubber(self, art):
+        self.blit.remove(self._rubber); self._rubber=self.blit.add(art)
 
     def _update_poly(self, xy, preview=False):
         xs=[p[0] for p in self._pts]; ys=[p[1] for p in self._pts]
         if preview: xs=xs+[xy[0]]; ys=ys+[xy[1]]
         if self._rubber is None or not isinstance(self._rubber, Line2D):
-            self._rubber=Line2D(xs, ys, linestyle='-', marker='o', color='C0'); self.ax.add_line(self._rubber)
+            self._set_rubber(self.ax.add_line(Line2D(xs, ys, linestyle='-', marker='o', color='C0')))
         else:
             self._rubber.set_data(xs, ys)
         # HUD
@@ -116,26 +136,26 @@ class GeometrySketcher(QtCore.QObject):
             L=((x1-x0)**2+(y1-y0)**2)**0.5; ang=np.degrees(np.arctan2(y1-y0, x1-x0))
             txt=f"{L/12:.2f} ft @ {ang:.1f}°"
             if self._hud is None:
-                self._hud=self.ax.text((x0+x1)/2,(y0+y1)/2,txt, color='crimson', fontsize=8)
+                self._hud=self.blit.add(self.ax.text((x0+x1)/2,(y0+y1)/2,txt, color='crimson', fontsize=8))
             else:
                 self._hud.set_position(((x0+x1)/2,(y0+y1)/2)); self._hud.set_text(txt)
-        self.ax.figure.canvas.draw_idle()
+        self.blit.update()
 
     def _update_rect(self, xy, preview=False):
         x0,y0=self._press; x1,y1=xy; x=min(x0,x1); y=min(y0,y1); w=abs(x1-x0); h=abs(y1-y0)
         if self._rubber is None or not isinstance(self._rubber, Rectangle):
-            self._rubber=Rectangle((x,y), w, h, fill=False, edgecolor='C1'); self.ax.add_patch(self._rubber)
+            self._set_rubber(self.ax.add_patch(Rectangle((x,y), w, h, fill=False, edgecolor='C1')))
         else:
             self._rubber.set_xy((x,y)); self._rubber.set_width(w); self._rubber.set_height(h)
-        self.ax.figure.canvas.draw_idle()
+        self.blit.update()
 
     def _update_circle(self, xy, preview=False):
         x0,y0=self._press; x1,y1=xy; r=((x1-x0)**2+(y1-y0)**2)**0.5
         if self._rubber is None or not isinstance(self._rubber, Circle):
-            self._rubber=Circle((x0,y0), r, fill=False, edgecolor='C2'); self.ax.add_patch(self._rubber)
+            self._set_rubber(self.ax.add_patch(Circle((x0,y0), r, fill=False, edgecolor='C2')))
         else:
             self._rubber.center=(x0,y0); self._rubber.set_radius(r)
-        self.ax.figure.canvas.draw_idle()
+        self.blit.update()
 
     def _finish_poly(self):
         if len(self._pts)>=3:
@@ -148,7 +168,5 @@ class GeometrySketcher(QtCore.QObject):
         self._clear_temp()
 
     def _emit_circle(self):
-        x0,y0=self._press; r=self._rubber.get_radius()
-        th=np.linspace(0,2*np.pi,64,endpoint=False)
-        self.polygonFinished.emit([(x0+r*np.cos(t), y0+r*np.sin(t)) for t in th])
+        self.polygonFinished.emit(circle_points(self._press, self._rubber.get_radius()))
         self._clear_temp()
@@ -2,12 +2,14 @@
 from __future__ import annotations
 from PySide6 import QtCore
 from matplotlib.lines import Line2D
+from .blit import BlitManager
 
 class LoadSketchMode: NONE=0; LINE=1; POINT=2
 
 class LoadSketcher(QtCore.QObject):
-    def __init__(self, ax, snap=True, grid=12.0):
+    def __init__(self, ax, snap=True, grid=12.0, blit=None):
         super().__init__(); self.ax=ax; self.snap=snap; self.grid=grid
+        self.blit=blit or BlitManager(ax.figure.canvas)
         self.mode=LoadSketchMode.NONE; self._pts=[]; self._rubber=None
         c=ax.figure.canvas
         c.mpl_connect('button_press_event', self._press)
@@ -35,14 +37,11 @@ class LoadSketcher(QtCore.QObject):
         if self.mode==LoadSketchMode.LINE and e.key in ('enter','return') and len(self._pts)>=2:
             if hasattr(self,'_line_cb'): self._line_cb(list(self._pts)); self._pts=[]; self._clear()
     def _clear(self):
-        if self._rubber is not None:
-            try: self._rubber.remove()
-            except Exception: pass
-        self._rubber=None; self.ax.figure.canvas.draw_idle()
+        self.blit.remove(self._rubber); self._rubber=None; self.blit.update()
     def _update(self, xy, preview=False):
         xs=[p[0] for p in self._pts]; ys=[p[1] for p in self._pts]
         if preview: xs=xs+[xy[0]]; ys=ys+[xy[1]]
         if self._rubber is None or not isinstance(self._rubber, Line2D):
-            self._rubber=Line2D(xs,ys,linestyle='-',marker='o',color='crimson'); self.ax.add_line(self._rubber)
+            self._rubber=self.blit.add(self.ax.add_line(Line2D(xs,ys,linestyle='-',marker='o',color='crimson')))
         else: self._rubber.set_data(xs,ys)
-        self.ax.figure.canvas.draw_idle()
+        self.blit.update()
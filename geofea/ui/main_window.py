@@ -1,16 +1,24 @@
 
-from PySide6 import QtCore, QtWidgets
-import numpy as np, matplotlib.pyplot as plt
+from PySide6 import QtCore, QtGui, QtWidgets
+import copy
+import os
+import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 from geofea.core.geometry import GeometryModel
-from geofea.core.mesher_triangle import mesh_polygon
-from geofea.core.loads import boundary_edges, edges_near_polyline, assemble_line_traction, assemble_point_load
-from geofea.core.solver import solve_linear
+from geofea.core.incremental import IncrementalMesher
+from geofea.core.materials.elastic import LinearElastic
+from geofea.core.materials.mohr_coulomb import MohrCoulomb
+from geofea.core import adapt, run
+from geofea.core.project import in_memory, is_mapped, save_project, load_project
+from geofea.core.profiling import Profile
 from geofea.ui.geom_draw_tool import GeometrySketcher, SketchMode
 from geofea.ui.load_tool import LoadSketcher, LoadSketchMode
 from geofea.ui.ribbon import Ribbon
-from geofea.ui.panels import ModelTree, DisplayOptions
+from geofea.ui.panels import ModelTree, DisplayOptions, DiagnosticsPanel
+from geofea.ui.worker import Task
+from geofea.ui.render import MeshRenderer
+from geofea.ui.blit import BlitManager
 
 class MplCanvas(FigureCanvas):
     def __init__(self):
@@ -44,7 +52,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.addDockWidget(QtCore.Qt.LeftDockWidgetArea, dock_tree)
         self.disp = DisplayOptions(); dock_disp = QtWidgets.QDockWidget('Display Options'); dock_disp.setWidget(self.disp)
         self.addDockWidget(QtCore.Qt.LeftDockWidgetArea, dock_disp)
-        self.tabifyDockWidget(dock_tree, dock_disp); dock_tree.raise_()
+        self.diag = DiagnosticsPanel(); dock_diag = QtWidgets.QDockWidget('Diagnostics'); dock_diag.setWidget(self.diag)
+        self.addDockWidget(QtCore.Qt.LeftDockWidgetArea, dock_diag)
+        self.tabifyDockWidget(dock_tree, dock_disp); self.tabifyDockWidget(dock_disp, dock_diag); dock_tree.raise_()
+        self.diag.exportRequested.connect(self.export_profile); self.profile=None
 
         # Status toggles
         self.chk_snap  = QtWidgets.QCheckBox('SNAP');  self.chk_snap.setChecked(True)
@@ -55,19 +66,38 @@ class MainWindow(QtWidgets.QMainWindow):
             w.stateChanged.connect(self._update_flags)
             self.statusBar().addPermanentWidget(w)
         self.lbl_xy = QtWidgets.QLabel(''); self.statusBar().addPermanentWidget(self.lbl_xy)
+        self.progress = QtWidgets.QProgressBar(); self.progress.setRange(0,100); self.progress.setMaximumWidth(160)
+        self.btn_cancel = QtWidgets.QPushButton('Cancel'); self.btn_cancel.clicked.connect(self.cancel_tasks)
+        for w in (self.progress, self.btn_cancel): w.hide(); self.statusBar().addPermanentWidget(w)
+
+        # Background jobs: one worker, later jobs queue behind the running one
+        self.pool = QtCore.QThreadPool(self); self.pool.setMaxThreadCount(1); self._tasks=[]
 
         # Model & tools
-        self.geom = GeometryModel(); self.nodes=None; self.elems=None; self.loads=[]
-        self.gsk = GeometrySketcher(self.canvas.ax, snap=True, grid=12.0, show_grid=True, ortho=False)
+        self.geom = GeometryModel(); self.nodes=None; self.elems=None; self.loads=[]; self.reactions=None; self.stress=None; self.u=None
+        self.region_ids=None; self.t_in=1.0; self._session=None; self.topo=None; self.path=None
+        self._mapped=None  # project file the mesh/result arrays are memory-mapped from
+        self.parts=None; self.remesher=IncrementalMesher()  # per-region meshes/K blocks reused across runs
+        self.blit = BlitManager(self.canvas)
+        self.gsk = GeometrySketcher(self.canvas.ax, snap=True, grid=12.0, show_grid=True, ortho=False, blit=self.blit)
         self.gsk.on_polygon_finished(self._poly_done)
-        self.lsk = LoadSketcher(self.canvas.ax, snap=True, grid=12.0); self.lsk.on_line_finished(self._line_done); self.lsk.on_point_finished(self._point_done)
+        self.lsk = LoadSketcher(self.canvas.ax, snap=True, grid=12.0, blit=self.blit); self.lsk.on_line_finished(self._line_done); self.lsk.on_point_finished(self._point_done)
         self.canvas.mpl_connect('motion_notify_event', self._mouse_xy)
+        self.render = MeshRenderer(self.canvas.ax); self.disp.toggled.connect(self._display_changed)
 
         # Ribbon content
-        self._setup_geometry_page(); self._setup_loading_page(); self._setup_mesh_page()
+        self._setup_file_menu()
+        self._setup_geometry_page(); self._setup_materials_page(); self._setup_loading_page(); self._setup_mesh_page()
         self._update_flags(); self._redraw()
 
     # -------- Ribbon pages --------
+    def _setup_file_menu(self):
+        m = self.menuBar().addMenu('&File')
+        for text, key, slot in (('&Open…', QtGui.QKeySequence.Open, self.open_project),
+                                ('&Save', QtGui.QKeySequence.Save, self.save_project),
+                                ('Save &As…', QtGui.QKeySequence.SaveAs, self.save_project_as)):
+            act = m.addAction(text); act.setShortcut(key); act.triggered.connect(slot)
+
     def _setup_geometry_page(self):
         L = self.ribbon.page('Geometry')
         btn_poly = QtWidgets.QPushButton('Polygon'); btn_poly.clicked.connect(lambda: self._set_geom_mode(SketchMode.POLY))
@@ -75,6 +105,30 @@ class MainWindow(QtWidgets.QMainWindow):
         btn_circle = QtWidgets.QPushButton('Circle'); btn_circle.clicked.connect(lambda: self._set_geom_mode(SketchMode.CIRCLE))
         for w in (btn_poly, btn_rect, btn_circle): L.insertWidget(0, w)
 
+    def _setup_materials_page(self):
+        L = self.ribbon.page('Materials & Staging')
+        self.mat_name = QtWidgets.QComboBox(); self.mat_name.setEditable(True); self.mat_name.addItems(list(self.geom.materials))
+        self.mat_E = QtWidgets.QDoubleSpinBox(); self.mat_E.setRange(1e-3,1e9); self.mat_E.setSuffix(' ksi'); self.mat_E.setValue(30.0)
+        self.mat_nu = QtWidgets.QDoubleSpinBox(); self.mat_nu.setRange(0.0,0.499); self.mat_nu.setDecimals(3); self.mat_nu.setSingleStep(0.05); self.mat_nu.setValue(0.2)
+        self.mat_model = QtWidgets.QComboBox(); self.mat_model.addItems(['Linear elastic', 'Mohr–Coulomb'])
+        self.mat_c = QtWidgets.QDoubleSpinBox(); self.mat_c.setRange(0.0,1e6); self.mat_c.setDecimals(4); self.mat_c.setSuffix(' ksi'); self.mat_c.setValue(0.01)
+        self.mat_phi = QtWidgets.QDoubleSpinBox(); self.mat_phi.setRange(0.0,89.0); self.mat_phi.setSuffix('°'); self.mat_phi.setValue(30.0)
+        self.mat_psi = QtWidgets.QDoubleSpinBox(); self.mat_psi.setRange(0.0,89.0); self.mat_psi.setSuffix('°')
+        self.chk_tension = QtWidgets.QCheckBox('Tension cut-off')
+        self.mat_tension = QtWidgets.QDoubleSpinBox(); self.mat_tension.setRange(0.0,1e6); self.mat_tension.setDecimals(4); self.mat_tension.setSuffix(' ksi')
+        self.mat_gamma = QtWidgets.QDoubleSpinBox(); self.mat_gamma.setRange(0.0,1000.0); self.mat_gamma.setSuffix(' pcf')
+        self._plastic_widgets = (self.mat_c, self.mat_phi, self.mat_psi, self.chk_tension, self.mat_tension, self.mat_gamma)
+        self.mat_model.currentIndexChanged.connect(lambda i: [w.setEnabled(i==1) for w in self._plastic_widgets])
+        for w in self._plastic_widgets: w.setEnabled(False)
+        self.mat_name.currentTextChanged.connect(self._show_material)
+        btn_def = QtWidgets.QPushButton('Define material'); btn_def.clicked.connect(self._define_material)
+        btn_assign = QtWidgets.QPushButton('Assign to region'); btn_assign.clicked.connect(self._assign_material)
+        for w in (btn_assign, btn_def, self.mat_gamma, QtWidgets.QLabel('γ:'), self.mat_tension, self.chk_tension,
+                  self.mat_psi, QtWidgets.QLabel('ψ:'), self.mat_phi, QtWidgets.QLabel('φ:'), self.mat_c, QtWidgets.QLabel('c:'),
+                  self.mat_model, self.mat_nu, QtWidgets.QLabel('ν:'), self.mat_E, QtWidgets.QLabel('E:'), self.mat_name):
+            L.insertWidget(0, w)
+        for name in self.geom.materials: self.tree.add_material(name)
+
     def _setup_loading_page(self):
         L = self.ribbon.page('Loading')
         self.tx = QtWidgets.QDoubleSpinBox(); self.tx.setRange(-1e6,1e6); self.tx.setSuffix(' kip/ft'); self.tx.setValue(1.0)
@@ -90,9 +144,27 @@ class MainWindow(QtWidgets.QMainWindow):
     def _setup_mesh_page(self):
         L = self.ribbon.page('Mesh')
         self.max_area = QtWidgets.QDoubleSpinBox(); self.max_area.setRange(1e-3,1e9); self.max_area.setValue(25.0)
+        self.elem_type = QtWidgets.QComboBox(); self.elem_type.addItems(['3-node triangles', '6-node triangles'])
         btn_mesh = QtWidgets.QPushButton('Generate mesh'); btn_mesh.clicked.connect(self.mesh_model)
         btn_solve = QtWidgets.QPushButton('Solve'); btn_solve.clicked.connect(self.solve_model)
-        for w in (QtWidgets.QLabel('Max area (in²):'), self.max_area, btn_mesh, btn_solve): L.insertWidget(0, w)
+        self.chk_adapt = QtWidgets.QCheckBox('Adaptive')
+        self.chk_adapt.toggled.connect(self._adapt_toggled)
+        self.adapt_target = QtWidgets.QDoubleSpinBox(); self.adapt_target.setRange(0.1,50.0); self.adapt_target.setValue(5.0); self.adapt_target.setSuffix(' %')
+        self.adapt_dofs = QtWidgets.QSpinBox(); self.adapt_dofs.setRange(1000,10_000_000); self.adapt_dofs.setSingleStep(10000); self.adapt_dofs.setValue(200_000)
+        self.load_steps = QtWidgets.QSpinBox(); self.load_steps.setRange(1,1000); self.load_steps.setValue(10)
+        btn_fos = QtWidgets.QPushButton('Factor of safety'); btn_fos.clicked.connect(self.factor_of_safety)
+        for w in (QtWidgets.QLabel('Max area (in²):'), self.max_area, self.elem_type, btn_mesh, btn_solve, self.chk_adapt,
+                  QtWidgets.QLabel('Target error:'), self.adapt_target, QtWidgets.QLabel('Max DOFs:'), self.adapt_dofs,
+                  QtWidgets.QLabel('Load steps:'), self.load_steps, btn_fos):
+            L.insertWidget(0, w)
+
+    @property
+    def order(self): return self.elem_type.currentIndex()+1
+
+    def _adapt_toggled(self, on):
+        # the ZZ estimator and the A/ξ² area rule of geofea.core.adapt are for 3-node triangles
+        if on: self.elem_type.setCurrentIndex(0)
+        self.elem_type.setEnabled(not on)
 
     # -------- Modes & flags --------
     def _set_geom_mode(self, m): self.gsk.set_mode(m); self.lsk.set_mode(LoadSketchMode.NONE)
@@ -102,6 +174,37 @@ class MainWindow(QtWidgets.QMainWindow):
         self.lsk.snap = self.chk_snap.isChecked()
         self._redraw()
 
+    # -------- Materials --------
+    def _show_material(self, name):
+        m=self.geom.materials.get(name)
+        if m is None: return
+        self.mat_E.setValue(m.E); self.mat_nu.setValue(m.nu); self.mat_model.setCurrentIndex(int(isinstance(m, MohrCoulomb)))
+        if isinstance(m, MohrCoulomb):
+            self.mat_c.setValue(m.c); self.mat_phi.setValue(m.phi); self.mat_psi.setValue(m.psi); self.mat_gamma.setValue(m.unit_weight)
+            self.chk_tension.setChecked(m.tension is not None); self.mat_tension.setValue(m.tension or 0.0)
+
+    def _define_material(self):
+        name=self.mat_name.currentText().strip()
+        if not name: return
+        if self.mat_model.currentIndex()==1:
+            try:
+                m=MohrCoulomb(self.mat_E.value(), self.mat_nu.value(), self.mat_c.value(), self.mat_phi.value(), self.mat_psi.value(),
+                              self.mat_tension.value() if self.chk_tension.isChecked() else None, self.mat_gamma.value())
+            except ValueError as e:
+                QtWidgets.QMessageBox.warning(self,'Material',str(e)); return
+        else: m=LinearElastic(self.mat_E.value(), self.mat_nu.value())
+        if name not in self.geom.materials: self.tree.add_material(name)
+        self.geom.materials[name]=m
+        if self.mat_name.findText(name)<0: self.mat_name.addItem(name)
+
+    def _assign_material(self):
+        if not self.geom.regions: return
+        name=self.mat_name.currentText().strip()
+        if name not in self.geom.materials: self._define_material()
+        item=self.tree.currentItem(); names=[r.name for r in self.geom.regions]
+        r=self.geom.region(item.text(0)) if item is not None and item.text(0) in names else self.geom.regions[-1]
+        r.material=name; self.statusBar().showMessage(f'{r.name}: {name}')
+
     # -------- Sketch callbacks --------
     def _poly_done(self, pts):
         name=f'Region{len(self.geom.regions)+1}'; self.geom.add_polygon(name, pts, material='Elastic')
@@ -115,6 +218,76 @@ class MainWindow(QtWidgets.QMainWindow):
         self.loads.append({'type':'point','pt':pt,'Fx':self.Fx.value(),'Fy':self.Fy.value()})
         self.tree.add_load(f'Point: {pt[0]:.1f},{pt[1]:.1f}'); self._redraw(overdraw_loads=True)
 
+    # -------- Diagnostics --------
+    def _show_profile(self, P):
+        self.profile=P; self.diag.show_profile(P)
+
+    def export_profile(self):
+        if self.profile is None: return
+        path,_ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export run profile', 'profile.json', 'JSON (*.json)')
+        if path: self.profile.to_json(path)
+
+    # -------- Project files --------
+    FILE_FILTER = 'GeoFEA project (*.gfp)'
+
+    def save_project_as(self):
+        path,_ = QtWidgets.QFileDialog.getSaveFileName(self, 'Save project', self.path or 'model.gfp', self.FILE_FILTER)
+        if path: self.path=path; self.save_project()
+
+    def save_project(self):
+        if self.path is None: return self.save_project_as()
+        if self._mapped==os.path.normcase(os.path.abspath(self.path)): self._unmap()
+        mesh=None if self.nodes is None else {'nodes':self.nodes, 'elems':self.elems, 'region_ids':self.region_ids, 'topo':self.topo}
+        ids=None if self.region_ids is None else self.geom.material_ids(self.region_ids)
+        try:
+            save_project(self.path, self.geom, self.loads, {'t_in':self.t_in, 'max_area':self.max_area.value(), 'order':self.order if self.elems is None else self.elems.shape[1]//3}, mesh, ids,
+                         self.u, self.stress, None if self.reactions is None else self.reactions.ravel())
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, 'Save project', str(e)); return
+        self.statusBar().showMessage(f'Saved {self.path}')
+
+    def _unmap(self):
+        """Copy the arrays mapped from the open project into memory, so the file can be saved over."""
+        memo={}
+        mesh=in_memory({'nodes':self.nodes, 'elems':self.elems, 'region_ids':self.region_ids, 'topo':self.topo}, memo)
+        self.nodes, self.elems, self.region_ids, self.topo = mesh['nodes'], mesh['elems'], mesh['region_ids'], mesh['topo']
+        self.u, self.stress, self.reactions = (in_memory(a, memo) for a in (self.u, self.stress, self.reactions))
+        if self._session is not None and is_mapped(self._session.nodes): self._session=None
+        if self.nodes is not None: self.render.set_mesh(self.nodes, self.elems, self.topo); self._show_result()
+        self._mapped=None
+
+    def open_project(self):
+        path,_ = QtWidgets.QFileDialog.getOpenFileName(self, 'Open project', '', self.FILE_FILTER)
+        if path: self.load(path)
+
+    def load(self, path):
+        """Replace the model with a project file; mesh and result arrays stay memory-mapped."""
+        try:
+            P=load_project(path); mesh=P.mesh()
+            stress=P.stress(mesh['topo']) if mesh is not None and P.u is not None else None
+        except (OSError, ValueError, KeyError) as e:
+            QtWidgets.QMessageBox.critical(self, 'Open project', str(e)); return
+        self.cancel_tasks(); self.path=path; self._mapped=None if mesh is None else os.path.normcase(os.path.abspath(path))
+        self.geom, self.loads = P.geom, P.loads; self.t_in=P.settings.get('t_in', 1.0)
+        if 'max_area' in P.settings: self.max_area.setValue(P.settings['max_area'])
+        if P.settings.get('order', 1)==2: self.chk_adapt.setChecked(False)
+        self.elem_type.setCurrentIndex(P.settings.get('order', 1)-1)
+        self.tree.clear_items(); self.mat_name.clear(); self.mat_name.addItems(list(self.geom.materials))
+        for r in self.geom.regions: self.tree.add_region(r.name)
+        for name in self.geom.materials: self.tree.add_material(name)
+        for L in self.loads:
+            self.tree.add_load(f'Line: {len(L["poly"])} pts' if L['type']=='line' else f'Point: {L["pt"][0]:.1f},{L["pt"][1]:.1f}')
+        if mesh is None:
+            self.nodes=self.elems=self.region_ids=self.topo=self.parts=None; self._session=None; self.u=self.stress=self.reactions=None
+            self.render.set_mesh(None, None, None); self._redraw(); self._fit_view(); self.canvas.draw_idle()
+        else:
+            self._mesh_done(mesh)
+            if P.u is not None:
+                self.u=P.u; self.stress=stress
+                self.reactions=None if P.reactions is None else P.reactions.reshape(-1,2)
+                self._show_result(); self._redraw()
+        self.setWindowTitle(f'GeoFEA — {path}')
+
     # -------- View helpers --------
     def _mouse_xy(self, e):
         if e.inaxes==self.canvas.ax: self.statusBar().showMessage(f'{e.xdata:8.3f}, {e.ydata:8.3f}')
@@ -129,46 +302,92 @@ class MainWindow(QtWidgets.QMainWindow):
             self.canvas.ax.set_xlim(x0,x1); self.canvas.ax.set_ylim(y0,y1)
 
     def _redraw(self, overdraw_loads=False):
-        ax=self.canvas.ax; ax.clear()
-        for r in self.geom.regions:
-            pts=r.outer+[r.outer[0]]
-            ax.plot([p[0] for p in pts], [p[1] for p in pts], color='purple', lw=1.5)
-        if self.nodes is not None:
-            for tri in self.elems:
-                xy=self.nodes[tri]
-                ax.plot([xy[0,0],xy[1,0],xy[2,0],xy[0,0]], [xy[0,1],xy[1,1],xy[2,1],xy[0,1]], '-', lw=0.25, color='0.4')
-        if overdraw_loads or self.nodes is None:
-            for L in self.loads:
-                if L['type']=='line':
-                    xs=[p[0] for p in L['poly']]; ys=[p[1] for p in L['poly']]
-                    ax.plot(xs, ys, '-o', color='crimson', lw=1.2)
-                else:
-                    ax.plot([L['pt'][0]],[L['pt'][1]], marker='v', color='crimson')
-        ax.set_title('CAD View'); self.canvas.draw()
+        self.render.set_regions(self.geom.regions)
+        self.render.set_loads(self.loads, visible=overdraw_loads or self.nodes is None)
+        self.canvas.ax.set_title('CAD View'); self.canvas.draw_idle()
+
+    CONTOURS = {'None':None, 'σ1':'s1', 'σ3':'s3', 'von Mises':'von_mises', 'Mean stress':'mean', 'Yielded':'yielded'}
+
+    def _show_result(self, scale=30.0):
+        if self.u is None: self.render.set_result(None); return
+        key=self.CONTOURS.get(self.disp.contour.currentText())
+        vals=getattr(self.stress, key) if key and self.stress is not None else None
+        self.render.set_result(self.nodes+scale*self.u.reshape(-1,2), vals)
+
+    def _display_changed(self, opts):
+        self.render.set_display(nodes=opts['nodes'], elems=opts['elems'], mesh=opts['mesh'])
+        self._show_result(); self.canvas.draw_idle()
+
+    # -------- Background jobs --------
+    def _submit(self, fn, on_done):
+        task=Task(fn); self._tasks.append(task)
+        task.signals.progress.connect(self._progress)
+        task.signals.finished.connect(lambda res, t=task: (self._task_over(t), on_done(res)))
+        task.signals.failed.connect(lambda msg, t=task: (self._task_over(t), QtWidgets.QMessageBox.critical(self,'GeoFEA',msg)))
+        task.signals.cancelled.connect(lambda t=task: (self._task_over(t), self.statusBar().showMessage('Cancelled')))
+        self.progress.setValue(0); self.progress.show(); self.btn_cancel.show()
+        self.pool.start(task)
+
+    def _progress(self, stage, pct):
+        self.progress.setValue(pct); self.statusBar().showMessage(stage+'…')
+
+    def _task_over(self, task):
+        if task in self._tasks: self._tasks.remove(task)
+        if not self._tasks: self.progress.hide(); self.btn_cancel.hide()
+
+    def cancel_tasks(self):
+        for t in self._tasks: t.cancel()
 
     # -------- Mesh & Solve --------
     def mesh_model(self):
         if not self.geom.regions:
             QtWidgets.QMessageBox.warning(self,'Mesh','Draw a region first.'); return
-        poly=self.geom.regions[0].outer
-        self.nodes, self.elems = mesh_polygon(poly, max_area=self.max_area.value(), quality=30)
-        self._redraw(); self._fit_view(); self.canvas.draw()
+        geom=copy.deepcopy(self.geom); area=self.max_area.value()
+        cache=self.remesher; order=self.order
+        self._submit(lambda report: run.mesh_model(geom, area, report=report, cache=cache, order=order), self._mesh_done)
+
+    def _mesh_done(self, mesh):
+        self.nodes, self.elems, self.region_ids, self.topo = mesh['nodes'], mesh['elems'], mesh['region_ids'], mesh['topo']
+        self.parts=mesh.get('parts')
+        self._session=None; self.stress=None; self.reactions=None; self.u=None
+        self.render.set_mesh(self.nodes, self.elems, self.topo)
+        self._redraw(); self._fit_view(); self.canvas.draw_idle()
+        if mesh.get('profile') is not None: self._show_profile(mesh['profile'])
+        self.statusBar().showMessage(f'Mesh: {len(self.nodes)} nodes, {len(self.elems)} elements')
 
     def solve_model(self):
-        if self.nodes is None: self.mesh_model()
-        F=np.zeros(2*self.nodes.shape[0]); edges=boundary_edges(self.elems)
-        for L in self.loads:
-            if L['type']=='line':
-                idx=edges_near_polyline(self.nodes, edges, L['poly'], tol_in=3.0)
-                F+=assemble_line_traction(self.nodes, edges, idx, L['tx'], L['ty'])
-            else:
-                Fp,_=assemble_point_load(self.nodes, L['pt'], L['Fx'], L['Fy']); F+=Fp
-        fixed={}; x=self.nodes[:,0]; y=self.nodes[:,1]
-        for n in np.where(np.isclose(y,y.min()))[0]: fixed[2*n+1]=0.0
-        for n in np.where(np.isclose(x,x.min()))[0]: fixed[2*n]=0.0
-        u=solve_linear(self.nodes, self.elems, 30.0, 0.2, 1.0, F, fixed)
-        scale=30.0; def_nodes=self.nodes+scale*u.reshape(-1,2)
-        self._redraw()
-        for tri in self.elems:
-            xy=def_nodes[tri]; self.canvas.ax.fill(xy[:,0],xy[:,1], alpha=0.4, color='C0')
-        self.canvas.draw()
+        if not self.geom.regions:
+            QtWidgets.QMessageBox.warning(self,'Solve','Draw a region first.'); return
+        geom=copy.deepcopy(self.geom); loads=[dict(L) for L in self.loads]; area=self.max_area.value()
+        mesh=None if self.nodes is None else {'nodes':self.nodes, 'elems':self.elems, 'region_ids':self.region_ids, 'topo':self.topo, 'parts':self.parts}
+        session=self._session; t_in=self.t_in; prof=Profile('solve', capture=self.diag.chk_capture.isChecked()); cache=self.remesher; order=self.order
+        if self.chk_adapt.isChecked():
+            target=self.adapt_target.value()/100; budget=self.adapt_dofs.value(); prof.name='adaptive'
+            self._submit(lambda report: adapt.solve_adaptive(geom, loads, t_in, target, budget, max_area=area, report=report, profile=prof),
+                         self._solve_done)
+            return
+        steps=self.load_steps.value()
+        self._submit(lambda report: run.solve_model(geom, loads, t_in, mesh, session, area, report=report, profile=prof,
+                                                    cache=cache, order=order, steps=steps), self._solve_done)
+
+    def factor_of_safety(self):
+        if not run.is_plastic(self.geom):
+            QtWidgets.QMessageBox.warning(self,'Factor of safety','Assign a Mohr–Coulomb material first.'); return
+        geom=copy.deepcopy(self.geom); loads=[dict(L) for L in self.loads]; area=self.max_area.value()
+        mesh=None if self.nodes is None else {'nodes':self.nodes, 'elems':self.elems, 'region_ids':self.region_ids, 'topo':self.topo, 'parts':self.parts}
+        session=self._session; t_in=self.t_in; prof=Profile('strength reduction', capture=self.diag.chk_capture.isChecked())
+        cache=self.remesher; order=self.order
+        self._submit(lambda report: run.factor_of_safety(geom, loads, t_in, mesh, session, area, report=report, profile=prof,
+                                                         cache=cache, order=order), self._solve_done)
+
+    def _solve_done(self, res):
+        if res['mesh']['nodes'] is not self.nodes: self._mesh_done(res['mesh'])
+        self._session=res['session']; self.stress=res['stress']; self.u=res['u']; info=res['info']
+        R=info.reactions; self.reactions=R.reshape(-1,2)
+        with res['profile'].stage('draw'): self._show_result(); self._redraw(); self.canvas.draw()
+        self._show_profile(res['profile'])
+        steps='' if 'eta' not in res else f" after {len(res['history'])} adaptive steps (error {res['eta']:.1%}, stop: {res['stop']})"
+        if 'fos' in res: steps=f" — factor of safety {res['fos']:.3f} ({len(res['trials'])} trials)"
+        elif 'load_factor' in res: steps=f" — load factor {res['load_factor']:.3f}"+('' if res['converged'] else ' (collapse)')
+        self.statusBar().showMessage(f'Solved {info.ndof} DOFs ({info.nfree} free, {info.method}, {info.time_s:.2f} s){steps} — '
+                                     f'reactions ΣRx={R[0::2].sum():.3f} kip, ΣRy={R[1::2].sum():.3f} kip')
@@ -11,7 +11,10 @@ class ModelTree(QtWidgets.QTreeWidget):
         self.loading    = QtWidgets.QTreeWidgetItem(self, ["Loading"])
         self.expandAll()
     def add_region(self, name): QtWidgets.QTreeWidgetItem(self.external,[name]); self.expandAll()
+    def add_material(self, name): QtWidgets.QTreeWidgetItem(self.materials,[name]); self.expandAll()
     def add_load(self, desc):  QtWidgets.QTreeWidgetItem(self.loading,[desc]); self.expandAll()
+    def clear_items(self):
+        for parent in (self.external, self.materials, self.loading): parent.takeChildren()
 
 class DisplayOptions(QtWidgets.QWidget):
     toggled = QtCore.Signal(dict)
@@ -20,8 +23,40 @@ class DisplayOptions(QtWidgets.QWidget):
         self.chk_nodes = QtWidgets.QCheckBox("Node Numbers")
         self.chk_elems = QtWidgets.QCheckBox("Element Numbers")
         self.chk_mesh  = QtWidgets.QCheckBox("Discretizations with mesh"); self.chk_mesh.setChecked(True)
+        self.contour   = QtWidgets.QComboBox(); self.contour.addItems(["None","σ1","σ3","von Mises","Mean stress","Yielded"])
         lay=QtWidgets.QVBoxLayout(self)
-        lay.addWidget(self.chk_nodes); lay.addWidget(self.chk_elems); lay.addWidget(self.chk_mesh); lay.addStretch(1)
+        lay.addWidget(self.chk_nodes); lay.addWidget(self.chk_elems); lay.addWidget(self.chk_mesh)
+        lay.addWidget(QtWidgets.QLabel("Contours")); lay.addWidget(self.contour); lay.addStretch(1)
         for c in (self.chk_nodes,self.chk_elems,self.chk_mesh): c.stateChanged.connect(self._emit)
+        self.contour.currentTextChanged.connect(self._emit)
     def _emit(self,*_):
-        self.toggled.emit({"nodes":self.chk_nodes.isChecked(),"elems":self.chk_elems.isChecked(),"mesh":self.chk_mesh.isChecked()})
+        self.toggled.emit({"nodes":self.chk_nodes.isChecked(),"elems":self.chk_elems.isChecked(),"mesh":self.chk_mesh.isChecked(),
+                           "contour":self.contour.currentText()})
+
+class DiagnosticsPanel(QtWidgets.QWidget):
+    """Stage timings, peak memory and counters of the last run (a geofea.core.profiling.Profile)."""
+    exportRequested = QtCore.Signal()
+    def __init__(self):
+        super().__init__()
+        self.tree = QtWidgets.QTreeWidget(); self.tree.setHeaderLabels(["Item","Value","Peak MB"]); self.tree.setRootIsDecorated(True)
+        self.chk_capture = QtWidgets.QCheckBox("Capture cProfile + tracemalloc")
+        self.btn_export  = QtWidgets.QPushButton("Export JSON…"); self.btn_export.setEnabled(False)
+        self.btn_export.clicked.connect(self.exportRequested)
+        lay=QtWidgets.QVBoxLayout(self)
+        lay.addWidget(self.tree); lay.addWidget(self.chk_capture); lay.addWidget(self.btn_export)
+    def _section(self, title, rows):
+        top=QtWidgets.QTreeWidgetItem(self.tree,[title])
+        for r in rows: QtWidgets.QTreeWidgetItem(top,[str(c) for c in r])
+        top.setExpanded(True)
+    def show_profile(self, P):
+        self.tree.clear()
+        self._section(f"Stages ({P.total_s:.3f} s)",
+                      [(s['stage'], f"{s['seconds']:.3f} s", '' if s['peak_rss_mb'] is None else f"{s['peak_rss_mb']:.0f}") for s in P.stages])
+        self._section("Counters", [(k, f'{v:.3g}' if isinstance(v,float) else v) for k,v in P.counters.items()])
+        if P.cprofile:
+            self._section("Hotspots (cumulative)", [(r['function'], f"{r['cumtime_s']:.3f} s", r['ncalls']) for r in P.cprofile[:15]])
+        if P.tracemalloc:
+            self._section(f"Allocations (peak {P.tracemalloc['peak_mb']:.0f} MB)",
+                          [(r['where'], f"{r['size_mb']:.1f} MB", r['count']) for r in P.tracemalloc['top'][:10]])
+        for i in range(3): self.tree.resizeColumnToContents(i)
+        self.btn_export.setEnabled(True)
@@ -0,0 +1,91 @@
+
+from __future__ import annotations
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.lines import Line2D
+
+class MeshRenderer:
+    """Persistent artists for geometry, loads, mesh and results on one Axes.
+
+    Everything is one collection/line artist per layer; updates replace artist data in place
+    instead of clearing the axes. Node/element labels are only created for the visible
+    viewport (and not at all beyond max_labels)."""
+    max_labels = 1500
+
+    def __init__(self, ax):
+        self.ax=ax
+        self.regions=LineCollection([], colors='purple', lw=1.5, zorder=3)
+        self.mesh=LineCollection([], colors='0.4', lw=0.25, zorder=2)
+        self.result=PolyCollection([], facecolors='C0', edgecolors='none', alpha=0.4, zorder=1, cmap='jet')
+        self.load_lines=LineCollection([], colors='crimson', lw=1.2, zorder=4)
+        self.load_verts=Line2D([], [], ls='none', marker='o', color='crimson', zorder=4)
+        self.load_points=Line2D([], [], ls='none', marker='v', color='crimson', zorder=4)
+        self.nodes=None; self.elems=None; self.labels=[]
+        self.show_nodes=False; self.show_elems=False; self.show_mesh=True
+        self._attach()
+        ax.callbacks.connect('xlim_changed', lambda _ax: self._update_labels())
+        ax.callbacks.connect('ylim_changed', lambda _ax: self._update_labels())
+
+    def _attach(self):
+        """(Re-)add any artist that is not on the axes, e.g. after an ax.clear()."""
+        kids=set(self.ax.get_children())
+        for c in (self.result, self.mesh, self.regions, self.load_lines):
+            if c not in kids: self.ax.add_collection(c, autolim=False)
+        for l in (self.load_verts, self.load_points):
+            if l not in kids: self.ax.add_line(l)
+
+    # -------- layers --------
+    def set_regions(self, regions):
+        self._attach()
+        self.regions.set_segments([np.vstack([r.outer, r.outer[:1]]) for r in regions]+
+                                  [np.vstack([h, h[:1]]) for r in regions for h in r.holes])
+
+    def set_loads(self, loads, visible=True):
+        lines=[np.asarray(L['poly'], float) for L in loads if L['type']=='line']
+        pts=np.array([L['pt'] for L in loads if L['type']!='line'], float).reshape(-1,2)
+        verts=np.vstack(lines) if lines else np.zeros((0,2))
+        self.load_lines.set_segments(lines); self.load_verts.set_data(verts[:,0], verts[:,1])
+        self.load_points.set_data(pts[:,0], pts[:,1])
+        for a in (self.load_lines, self.load_verts, self.load_points): a.set_visible(visible)
+
+    def set_mesh(self, nodes, elems, topo):
+        self.nodes=nodes; self.elems=elems
+        if nodes is None:
+            self.mesh.set_segments([]); self.set_result(None)
+        else:
+            self.mesh.set_segments(nodes[topo.edges])
+        self.mesh.set_visible(self.show_mesh); self._update_labels()
+
+    def set_result(self, def_nodes, values=None):
+        """Deformed shape (None hides it); values colour it per element, else flat fill."""
+        if def_nodes is None:
+            self.result.set_verts([]); self.result.set_array(None); return
+        self.result.set_verts(def_nodes[self.elems[:,:3]])
+        if values is None:
+            self.result.set_array(None); self.result.set_facecolor('C0'); self.result.set_alpha(0.4)
+        else:
+            v=np.asarray(values, float); self.result.set_array(v); self.result.set_alpha(0.9)
+            self.result.set_clim(float(v.min()), float(v.max()))
+
+    def set_display(self, nodes=None, elems=None, mesh=None):
+        if nodes is not None: self.show_nodes=nodes
+        if elems is not None: self.show_elems=elems
+        if mesh is not None: self.show_mesh=mesh; self.mesh.set_visible(mesh)
+        self._update_labels()
+
+    # -------- viewport labels --------
+    def _update_labels(self):
+        for t in self.labels:
+            try: t.remove()
+            except Exception: pass
+        self.labels=[]
+        if self.nodes is None or not (self.show_nodes or self.show_elems): return
+        (x0,x1),(y0,y1)=self.ax.get_xlim(), self.ax.get_ylim()
+        def visible(p): return np.flatnonzero((p[:,0]>=min(x0,x1))&(p[:,0]<=max(x0,x1))&(p[:,1]>=min(y0,y1))&(p[:,1]<=max(y0,y1)))
+        jobs=[]
+        if self.show_nodes: jobs.append((self.nodes, 'navy'))
+        if self.show_elems: jobs.append((self.nodes[self.elems[:,:3]].mean(axis=1), 'darkgreen'))
+        for P,color in jobs:
+            idx=visible(P)
+            if len(idx)>self.max_labels: continue
+            self.labels+=[self.ax.text(P[i,0], P[i,1], str(i), fontsize=6, color=color, ha='center', va='center', zorder=5) for i in idx]
@@ -0,0 +1,40 @@
+
+from __future__ import annotations
+import threading
+import traceback
+from PySide6 import QtCore
+
+class Cancelled(Exception):
+    pass
+
+class TaskSignals(QtCore.QObject):
+    progress = QtCore.Signal(str, int)
+    finished = QtCore.Signal(object)
+    failed = QtCore.Signal(str)
+    cancelled = QtCore.Signal()
+
+class Task(QtCore.QRunnable):
+    """Runs fn(report) on a QThreadPool. report(stage, percent) emits progress and raises
+    Cancelled once cancel() was called, so jobs stop at the next stage boundary."""
+    def __init__(self, fn):
+        super().__init__()
+        self.fn=fn; self.signals=TaskSignals(); self._cancel=threading.Event()
+        self.setAutoDelete(False)
+
+    def cancel(self): self._cancel.set()
+    def is_cancelled(self): return self._cancel.is_set()
+
+    def report(self, stage, percent):
+        if self._cancel.is_set(): raise Cancelled()
+        self.signals.progress.emit(stage, int(percent))
+
+    def run(self):
+        try:
+            self.report('Starting', 0); out=self.fn(self.report)
+            if self._cancel.is_set(): raise Cancelled()
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            traceback.print_exc(); self.signals.failed.emit(f'{type(e).__name__}: {e}')
+        else:
+            self.signals.finished.emit(out)